@@ -3,6 +3,9 @@ Demonstration module for the Mod-Three FSM solution.
 
 This module contains demonstration functions for the ModThreeFSM and mod_three implementations.
 
+The library modules do not configure logging. Applications using these demos should
+configure it themselves (e.g. with logging.basicConfig), as src/main.py does.
+
 Author: Muhammad Tariq
 """
 
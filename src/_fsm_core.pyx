@@ -0,0 +1,50 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Optional compiled core for the Finite State Machine transition loop.
+
+This module is a drop-in accelerator for the pure-Python loop built by
+src.finite_state_machine._specialize_runner. It is not required: the FSM
+falls back to the pure-Python loop when this extension has not been built.
+
+Build it in place with:
+    cythonize -i src/_fsm_core.pyx
+
+Author: Muhammad Tariq
+"""
+
+
+# Number of symbols walked between two checks for a sink state (as in finite_state_machine.py)
+cdef enum:
+    SINK_CHECK_INTERVAL = 256
+
+
+cpdef int run_table(const int[:] table, int num_symbols, const unsigned char[:] encoded, int state_id,
+                    const unsigned char[:] is_sink):
+    """
+    Walk a flat transition table over a buffer of encoded input symbols.
+    
+    The whole input is processed in one call, so the Python/C boundary is crossed
+    once per input sequence rather than once per symbol. Like the pure-Python loop,
+    the walk stops early once it is in a sink state, checking once per block of
+    SINK_CHECK_INTERVAL symbols.
+    
+    Args:
+        table: Flat table where table[state_id * num_symbols + symbol_id] is the next
+               state ID. Undefined transitions must already point to an absorbing state.
+        num_symbols: Number of symbols in the alphabet (the row width of the table)
+        encoded: Buffer of symbol IDs, one byte per symbol
+        state_id: ID of the state to start from
+        is_sink: One flag per state ID, nonzero for states that no symbol leaves
+        
+    Returns:
+        The ID of the final state
+    """
+    cdef Py_ssize_t start, i, end
+    cdef Py_ssize_t length = encoded.shape[0]
+    for start in range(0, length, SINK_CHECK_INTERVAL):
+        end = min(start + SINK_CHECK_INTERVAL, length)
+        for i in range(start, end):
+            state_id = table[state_id * num_symbols + encoded[i]]
+        if is_sink[state_id]:
+            break
+    return state_id
@@ -16,18 +16,35 @@ Author: Muhammad Tariq
 Date: 2025-05-04
 """
 
-from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple, Union
+from array import array
+from functools import partial
+from typing import AbstractSet, Any, Callable, Dict, Iterable, List, MutableSequence, Optional, Sequence, Tuple, Union, cast
 import logging
 
-# Configure logging with a standard format that includes timestamp, logger name, level, and message
-# This helps with debugging and understanding the sequence of operations
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-# Get a logger specific to this module, which allows targeted log filtering
+try:
+    # Optional compiled transition loop - see src/_fsm_core.pyx for how to build it
+    from src._fsm_core import run_table as _native_run_table  # type: ignore[import-not-found]
+except ImportError:
+    _native_run_table = None
+
+# Get a logger specific to this module, which allows targeted log filtering.
+# As a library module, this does not configure logging itself - that is left to the
+# application (see configure_logging in src/main.py)
 logger = logging.getLogger(__name__)
 
+# A compiled state history: one state ID per entry (a bytearray below 256 states, see compile())
+_StateIds = Union[bytearray, 'array[int]']
+
+# Byte used by compiled string encoding tables to mark characters outside the alphabet
+_INVALID_BYTE = 0xFF
+
+# Number of symbols compiled FSMs process between two checks for a sink state
+_SINK_CHECK_INTERVAL = 256
+
+# Number of transition lookups after which FiniteStateMachine.accepts stops looking for
+# a short deciding suffix and walks the whole input instead (a few milliseconds)
+_MAX_SUFFIX_WORK = 1 << 16
+
 
 class FSMException(Exception):
     """
@@ -74,6 +91,173 @@ class InvalidTransitionError(FSMException):
     pass
 
 
+def _run_table(
+    table: List[List[int]],
+    encoded_inputs: Iterable[int],
+    state_id: int,
+    visited: Optional[MutableSequence[int]]
+) -> Tuple[int, int]:
+    """
+    Walk a compiled transition table over a sequence of encoded input symbols.
+    
+    This is the tight inner loop used by compiled FSMs. It works purely on integers:
+    states and symbols have already been mapped to dense IDs, so each step is two list
+    indexes instead of building and hashing a (state, symbol) tuple.
+    
+    Args:
+        table: One row per state, where table[state_id][symbol_id] is the next state ID,
+               or -1 if the transition is undefined
+        encoded_inputs: Sequence of symbol IDs to process
+        state_id: ID of the state to start from
+        visited: List or array that receives the ID of every state entered, or None to
+                 skip recording
+        
+    Returns:
+        A tuple (state_id, position) where state_id is the last state reached and
+        position is the index of the first undefined transition, or -1 if all inputs
+        were processed
+    """
+    if visited is None:
+        for position, symbol_id in enumerate(encoded_inputs):
+            next_id = table[state_id][symbol_id]
+            if next_id < 0:
+                return state_id, position
+            state_id = next_id
+        return state_id, -1
+    
+    visit = visited.append
+    for position, symbol_id in enumerate(encoded_inputs):
+        next_id = table[state_id][symbol_id]
+        if next_id < 0:
+            return state_id, position
+        state_id = next_id
+        visit(next_id)
+    return state_id, -1
+
+
+def _specialize_runner(table: List[List[int]]) -> Callable[[Sequence[int], int], int]:
+    """
+    Build a transition loop specialized for one compiled transition table.
+    
+    The specialized loop is the leanest possible walk: no position tracking, no
+    per-step check for undefined transitions, and the table bound as a default argument
+    so it is a local variable inside the loop. To drop the check, undefined transitions
+    (-1) are redirected to an extra absorbing "dead" state whose ID is len(table); the
+    caller only has to test for that ID once after the loop. Inputs are validated before
+    the walk, so the loop also stops early once it is in a sink state, which no further
+    symbol can leave; any remaining history is then filled in with one bulk copy.
+    
+    The loop is a closure over the table rather than source generated per table with
+    exec(): even for the 3-state mod-three machine, an unrolled if/elif ladder over the
+    states measured about twice as slow as the two tuple indexes per step (3.2ms vs
+    1.5ms for 100,000 symbols on CPython 3.11+), since every step of the ladder runs
+    several compares and jumps.
+    
+    If the optional compiled core (src/_fsm_core.pyx) has been built, the returned
+    function runs the same loop in C instead, as long as symbol IDs fit in one byte.
+    
+    Args:
+        table: One row per state, where table[state_id][symbol_id] is the next state ID,
+               or -1 if the transition is undefined
+        
+    Returns:
+        A function run(encoded_inputs, state_id, visited=None) returning the final state
+        ID, which is len(table) if an undefined transition was hit. If visited (a
+        bytearray or array of state IDs) is given, the ID of every state entered is
+        appended to it
+    """
+    dead_id = len(table)
+    num_symbols = len(table[0])
+    rows = tuple(tuple(dead_id if next_id < 0 else next_id for next_id in row) for row in table)
+    if any(dead_id in row for row in rows):
+        # The dead state only needs a row if it is reachable
+        rows += ((dead_id,) * num_symbols,)
+    
+    # Sink states loop back to themselves on every symbol (the dead state is one), so once
+    # one is reached the rest of the input cannot change the result
+    sinks = frozenset(state_id for state_id, row in enumerate(rows) if row.count(state_id) == num_symbols)
+    
+    def run(
+        encoded_inputs: Sequence[int],
+        state_id: int,
+        visited: Optional[_StateIds] = None,
+        rows: Tuple[Tuple[int, ...], ...] = rows
+    ) -> int:
+        if not sinks:
+            if visited is None:
+                for symbol_id in encoded_inputs:
+                    state_id = rows[state_id][symbol_id]
+            else:
+                # Same loop, also recording every state entered (including the dead state)
+                visit = visited.append
+                for symbol_id in encoded_inputs:
+                    state_id = rows[state_id][symbol_id]
+                    visit(state_id)
+            return state_id
+        
+        # Check for a sink once per block rather than per symbol: a per-symbol check made
+        # the loop about twice as slow, a per-block one costs a few percent
+        for start in range(0, len(encoded_inputs), _SINK_CHECK_INTERVAL):
+            block = encoded_inputs[start:start + _SINK_CHECK_INTERVAL]
+            if visited is None:
+                for symbol_id in block:
+                    state_id = rows[state_id][symbol_id]
+            else:
+                visit = visited.append
+                for symbol_id in block:
+                    state_id = rows[state_id][symbol_id]
+                    visit(state_id)
+            if state_id in sinks:
+                remaining = len(encoded_inputs) - start - len(block)
+                if visited is not None and remaining > 0:
+                    # The rest of the history is the sink repeated: one C-level copy of
+                    # the last entry (a bytearray or array('i') slice, like the history)
+                    visited.extend(visited[-1:] * remaining)
+                break
+        return state_id
+    
+    if _native_run_table is not None and num_symbols <= 256:
+        flat_table = array('i', [next_id for row in rows for next_id in row])
+        sink_flags = bytes(state_id in sinks for state_id in range(len(rows)))
+        
+        def run_native(
+            encoded_inputs: Sequence[int],
+            state_id: int,
+            visited: Optional[_StateIds] = None
+        ) -> int:
+            if visited is not None:
+                # The compiled core only returns the final state
+                return run(encoded_inputs, state_id, visited)
+            if not isinstance(encoded_inputs, bytes):
+                encoded_inputs = bytes(encoded_inputs)
+            return _native_run_table(flat_table, num_symbols, encoded_inputs, state_id, sink_flags)
+        
+        return run_native
+    
+    return run
+
+
+def _invalid_input_error(input_sequence: Iterable, is_valid: Callable[[Any], bool]) -> InvalidInputError:
+    """
+    Build the error for the first invalid symbol in an input sequence.
+    
+    Batch validation only tells us *that* an input is invalid. This helper performs
+    the (rarely needed) second scan to report *where*, keeping the error messages
+    identical to the ones raised by per-symbol validation.
+    
+    Args:
+        input_sequence: The input sequence that failed validation
+        is_valid: Predicate returning True for symbols in the alphabet
+        
+    Returns:
+        An InvalidInputError describing the first invalid symbol and its position
+    """
+    for i, input_symbol in enumerate(input_sequence):
+        if not is_valid(input_symbol):
+            return InvalidInputError(f"Invalid input symbol '{input_symbol}' at position {i}")
+    return InvalidInputError("Invalid input symbol")
+
+
 class FiniteStateMachine:
     """
     A generic implementation of a Finite State Machine.
@@ -93,17 +277,20 @@ class FiniteStateMachine:
     3. Comprehensive error checking and validation
     4. Tracking of state history for debugging
     5. Integration with Python's logging system
+    6. Optional compilation of the transition function into a lookup table (see compile())
     
     The FSM is designed to be used either directly or as a base for more specific FSMs.
     """
     
     def __init__(
         self,
-        states: Set[Any],                       # Set of all possible states
-        alphabet: Set[Any],                     # Set of all possible input symbols
+        states: AbstractSet[Any],               # Set of all possible states
+        alphabet: AbstractSet[Any],             # Set of all possible input symbols
         initial_state: Any,                     # The starting state
-        final_states: Set[Any],                 # Set of final/accepting states
-        transition_function: Union[Dict[Tuple[Any, Any], Any], Callable[[Any, Any], Any]]  # The transition function
+        final_states: AbstractSet[Any],         # Set of final/accepting states
+        transition_function: Union[Dict[Tuple[Any, Any], Any], Callable[[Any, Any], Any]],  # The transition function
+        track_history: bool = True,             # Whether to record every state visited
+        validate_transitions: bool = False      # Whether to re-check callable results at runtime
     ):
         """
         Initialize the FSM with its components.
@@ -117,13 +304,21 @@ class FiniteStateMachine:
         - δ: Transition function
         
         Args:
-            states: Set of all possible states (Q in the formal definition)
-            alphabet: Set of all possible input symbols (Σ in the formal definition)
+            states: Set or frozenset of all possible states (Q in the formal definition)
+            alphabet: Set or frozenset of all possible input symbols (Σ in the formal definition)
             initial_state: The starting state (q0 in the formal definition)
-            final_states: Set of final/accepting states (F in the formal definition)
+            final_states: Set or frozenset of final/accepting states (F in the formal definition)
             transition_function: Either a dictionary mapping (state, input) -> next_state,
                                or a function that takes (state, input) and returns next_state
                                (δ in the formal definition)
+            track_history: Whether to record every visited state in state_history. Disabling
+                           it saves one append per processed symbol when only the final
+                           state is needed.
+            validate_transitions: Whether to check, on every step, that a callable transition
+                                  function returned a state in states. Dictionary transitions
+                                  are always fully validated here at construction, so this
+                                  only matters for callables, which are otherwise trusted to
+                                  return valid states. Useful while developing or testing.
         
         Raises:
             TypeError: If the arguments are not of the expected types (important for static analysis)
@@ -131,12 +326,14 @@ class FiniteStateMachine:
             InvalidInputError: If the transition function uses inputs not in the alphabet
         """
         # Validate input types - this improves type safety and provides clear error messages
-        if not isinstance(states, set):
-            raise TypeError("States must be provided as a set")
-        if not isinstance(alphabet, set):
-            raise TypeError("Alphabet must be provided as a set")
-        if not isinstance(final_states, set):
-            raise TypeError("Final states must be provided as a set")
+        # Frozensets are accepted as well: they can be shared between FSMs without any risk
+        # of one of them being changed from outside
+        if not isinstance(states, (set, frozenset)):
+            raise TypeError("States must be provided as a set or frozenset")
+        if not isinstance(alphabet, (set, frozenset)):
+            raise TypeError("Alphabet must be provided as a set or frozenset")
+        if not isinstance(final_states, (set, frozenset)):
+            raise TypeError("Final states must be provided as a set or frozenset")
             
         # Validate states - these checks ensure the FSM is well-formed from the start
         if initial_state not in states:
@@ -149,36 +346,317 @@ class FiniteStateMachine:
         # Store the FSM components as instance variables
         self._states = states                   # Store all possible states
         self._alphabet = alphabet               # Store all possible input symbols
+        # Identities of the alphabet's symbols. Inputs are usually the very same objects as
+        # the alphabet's (interned characters, enum members, shared instances), and an id()
+        # lookup never calls a user-defined __hash__/__eq__. The alphabet keeps the symbols
+        # alive, so their ids stay valid; a miss simply falls back to the regular lookup.
+        self._alphabet_ids = frozenset(map(id, alphabet))
         self._initial_state = initial_state     # Store the initial state
         self._final_states = final_states       # Store the final/accepting states
         self._current_state = initial_state     # Initialize current state to initial state
-        self._history = [initial_state]         # Track state history for debugging and analysis
+        self._track_history = track_history     # Whether state history is recorded
+        self._validate_transitions = validate_transitions  # Whether callable results are re-checked
+        # Track state history for debugging and analysis. This is a list of states until the
+        # FSM is compiled, and a compact array of state IDs afterwards (see compile())
+        self._history: Union[List[Any], _StateIds] = [initial_state]
+        self._history_snapshot: Optional[Tuple[Any, ...]] = None  # Cached state_history, None when stale
+        
+        # Compiled representation, populated by compile() - None means "not compiled"
+        self._table: Optional[List[List[int]]] = None
+        self._states_by_id: Tuple[Any, ...] = ()
+        self._symbols_by_id: Tuple[Any, ...] = ()
+        self._state_ids: Dict[Any, int] = {}
+        self._symbol_ids: Dict[Any, int] = {}
+        self._symbol_ids_by_identity: Dict[int, int] = {}
+        self._encode_table: Optional[bytes] = None
+        self._runner: Optional[Callable[..., int]] = None
+        self._new_history: Callable[..., _StateIds] = bytearray  # Compiled history type
+        self._is_final: Tuple[bool, ...] = ()   # Acceptance flag for each state ID
+        self._current_id = -1                   # ID of the current state once compiled
+        self._suffix_length: Optional[int] = None  # See accepts(), None until first needed
         
         # Store transition function - handle both callable and dictionary-based transition functions
+        self._transition_func: Optional[Callable[[Any, Any], Any]]
+        self._transition_dict: Optional[Dict[Tuple[Any, Any], Any]]
         if callable(transition_function):
             # If a function is provided, use it directly
             self._transition_func = transition_function
+            self._transition_dict = None
         else:
-            # If a dictionary is provided, create a function that uses the dictionary for lookups
-            # Using a lambda function here allows for a uniform interface regardless of how
-            # the transition function was defined
-            self._transition_func = lambda state, input_symbol: transition_function.get((state, input_symbol))
+            # If a dictionary is provided, keep it so compile() can build the lookup table from it.
+            # Dictionaries are always compiled below, so they never need wrapping in a function
+            # that would build and hash a (state, input) tuple per step
+            self._transition_func = None
+            self._transition_dict = transition_function
+            
+        # A dictionary is a static table, so it can always be compiled up front. Compiling
+        # also validates it, in the same single pass over the dictionary that builds the table
+        if self._transition_dict is not None:
+            self.compile()
+        
+        # Log initialization for debugging and operational visibility. The level check
+        # keeps the message from being formatted when INFO logging is off
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Initialized FSM with %d states and %d input symbols", len(states), len(alphabet))
+    
+    @property
+    def is_compiled(self) -> bool:
+        """
+        Check if the transition function has been compiled into a lookup table.
+        
+        Returns:
+            True if compile() has been called, False otherwise
+        """
+        return self._table is not None
+    
+    def compile(self) -> 'FiniteStateMachine':
+        """
+        Compile the transition function into a dense integer lookup table.
+        
+        Compilation trades a one-off O(|Q|×|Σ|) pass for a much cheaper per-symbol cost:
+        1. Every state and input symbol is assigned a dense integer ID
+        2. The transition function is evaluated once for every (state, symbol) pair
+        3. The results are stored in a table with one small row per state, indexed by
+           [state_id][symbol_id] - no tuple is built or hashed per step
+        
+        After compilation, process_input encodes the input once and walks the table,
+        avoiding the hashed (state, symbol) lookup and the transition function call
+        for every symbol. Dictionary-based transition functions are compiled automatically
+        at construction; callable ones are only compiled on request, since a callable must
+        be deterministic for the table to be valid.
+        
+        Returns:
+            The FSM itself, to allow chaining (e.g. FiniteStateMachine(...).compile())
+            
+        Raises:
+            InvalidStateError: If the transition function uses or leads to an invalid state
+            InvalidInputError: If a dictionary transition function uses an input not in the alphabet
+        """
+        # Decode the history of a previous compilation, since state IDs are reassigned below
+        history = self.state_history if self._track_history else []
+        
+        states_by_id, symbols_by_id, state_ids, symbol_ids, table = self._tabulate()
+        
+        self._table = table
+        self._states_by_id = states_by_id
+        self._symbols_by_id = symbols_by_id
+        self._state_ids = state_ids
+        self._symbol_ids = symbol_ids
+        self._symbol_ids_by_identity = {id(symbol): symbol_id for symbol, symbol_id in symbol_ids.items()}
+        self._encode_table = self._build_encode_table(symbol_ids)
+        self._runner = _specialize_runner(table)
+        self._suffix_length = None
+        # Acceptance is a tuple of bools rather than an int bitmask: in CPython a tuple index
+        # (~9ns) beats the shift, mask and bool() conversion a bitmask needs (~35ns), and it
+        # works unchanged for any number of states
+        self._is_final = tuple(state in self._final_states for state in states_by_id)
+        self._current_id = state_ids[self._current_state]
+        
+        # Store the history as one machine integer per state instead of one object pointer.
+        # With fewer than 256 states, every ID (including the dead state's, see
+        # _specialize_runner) fits a bytearray, which is as compact as array('B') but
+        # appends about twice as fast
+        self._new_history = bytearray if len(states_by_id) < 256 else partial(array, 'i')
+        self._history = self._new_history([state_ids[state] for state in history])
+        self._history_snapshot = None
+        
+        logger.debug("Compiled transition table of %d x %d entries", len(states_by_id), len(symbols_by_id))
+        return self
+    
+    def _tabulate(self) -> Tuple[Tuple[Any, ...], Tuple[Any, ...], Dict[Any, int], Dict[Any, int], List[List[int]]]:
+        """
+        Tabulate the transition function over dense state and symbol IDs.
+        
+        This is the work behind compile(), without storing anything on the FSM, so it
+        can also be used to analyze an FSM whose callable must stay uncompiled (see
+        minimized()). A callable transition function is called once for every
+        (state, symbol) pair.
+        
+        Returns:
+            A tuple (states_by_id, symbols_by_id, state_ids, symbol_ids, table), where
+            table[state_id][symbol_id] is the next state ID, or -1 if the transition is
+            undefined
             
-        # Validate transition function if it's a dictionary - ensures the transition function is valid
-        if isinstance(transition_function, dict):
-            for (state, input_symbol), next_state in transition_function.items():
+        Raises:
+            InvalidStateError: If the transition function uses or leads to an invalid state
+            InvalidInputError: If a dictionary transition function uses an input not in the alphabet
+        """
+        states_by_id = tuple(self._states)
+        symbols_by_id = tuple(self._alphabet)
+        state_ids = {state: i for i, state in enumerate(states_by_id)}
+        symbol_ids = {symbol: i for i, symbol in enumerate(symbols_by_id)}
+        
+        # -1 marks an undefined transition, mirroring a None result from the transition function
+        table = [[-1] * len(symbol_ids) for _ in states_by_id]
+        if self._transition_dict is not None:
+            # Validate and copy each entry in one pass: an ID lookup that misses is an invalid entry
+            for (state, symbol), next_state in self._transition_dict.items():
                 # Check that all states used in transitions are valid
-                if state not in states:
+                state_id = state_ids.get(state)
+                if state_id is None:
                     raise InvalidStateError(f"Transition from invalid state '{state}'")
                 # Check that all input symbols used in transitions are valid
-                if input_symbol not in alphabet:
-                    raise InvalidInputError(f"Transition with invalid input '{input_symbol}'")
+                symbol_id = symbol_ids.get(symbol)
+                if symbol_id is None:
+                    raise InvalidInputError(f"Transition with invalid input '{symbol}'")
                 # Check that all destination states are valid
-                if next_state not in states:
+                next_id = state_ids.get(next_state)
+                if next_id is None:
                     raise InvalidStateError(f"Transition to invalid state '{next_state}'")
+                table[state_id][symbol_id] = next_id
+        else:
+            transition_func = self._transition_func
+            assert transition_func is not None  # There is always either a dict or a callable
+            for state, state_id in state_ids.items():
+                for symbol, symbol_id in symbol_ids.items():
+                    next_state = transition_func(state, symbol)
+                    if next_state is None:
+                        continue
+                    if next_state not in state_ids:
+                        raise InvalidStateError(f"Transition to invalid state '{next_state}'")
+                    table[state_id][symbol_id] = state_ids[next_state]
+        
+        return states_by_id, symbols_by_id, state_ids, symbol_ids, table
+    
+    def minimized(self) -> 'FiniteStateMachine':
+        """
+        Build an equivalent FSM with the fewest possible states (Hopcroft's algorithm).
+        
+        Fewer states mean a smaller transition table to walk, which matters most for
+        generated or composed machines, where redundant states are common:
+        1. States that cannot be reached from the initial state are dropped
+        2. The remaining states are partitioned into final and non-final states, plus an
+           implicit dead state standing for every undefined transition
+        3. Blocks are split by the predecessors of a splitter block until no input symbol
+           distinguishes two states in the same block (Hopcroft's worklist refinement)
+        4. Each block becomes one state of the new FSM, represented by one of its states
+           (the initial state for the initial block)
+        
+        The dead state is kept apart from the real states, so the new FSM raises
+        InvalidTransitionError for exactly the inputs this one does, and it ends in a
+        final state for exactly the inputs this one does. The states it reports are the
+        block representatives, i.e. a subset of this FSM's states.
+        
+        This FSM is left as it is: a callable transition function that has not been
+        compiled is tabulated separately (see _tabulate), so it is called for every
+        (state, symbol) pair and must be deterministic, but this FSM keeps calling it.
+        
+        Returns:
+            A new FSM in its initial state, with the same alphabet and options
+        
+        Raises:
+            InvalidStateError: If the transition function leads to an invalid state
+        """
+        if self._table is not None:
+            states_by_id, symbols_by_id, state_ids = self._states_by_id, self._symbols_by_id, self._state_ids
+            table = self._table
+        else:
+            states_by_id, symbols_by_id, state_ids, _, table = self._tabulate()
+        num_symbols = len(symbols_by_id)
+        dead_id = len(table)
+        initial_id = state_ids[self._initial_state]
+        
+        # Only states reachable from the initial state can affect the result
+        reachable = {initial_id}
+        stack = [initial_id]
+        while stack:
+            for next_id in table[stack.pop()]:
+                if next_id >= 0 and next_id not in reachable:
+                    reachable.add(next_id)
+                    stack.append(next_id)
+        
+        # Predecessors of each state for each symbol, with undefined transitions leading
+        # to the dead state (which loops on every symbol)
+        predecessors: List[Dict[int, List[int]]] = [{dead_id: [dead_id]} for _ in range(num_symbols)]
+        for state_id in reachable:
+            for symbol_id, next_id in enumerate(table[state_id]):
+                predecessors[symbol_id].setdefault(next_id if next_id >= 0 else dead_id, []).append(state_id)
+        
+        # Initial partition: final states, non-final states and the dead state
+        final_ids = {state_id for state_id in reachable if states_by_id[state_id] in self._final_states}
+        blocks = [block for block in (final_ids, reachable - final_ids, {dead_id}) if block]
+        block_of = {state_id: index for index, block in enumerate(blocks) for state_id in block}
+        worklist = set(range(len(blocks)))
+        
+        while worklist:
+            splitter = tuple(blocks[worklist.pop()])
+            for by_target in predecessors:
+                # Group the states leading into the splitter by the block they belong to
+                touched: Dict[int, set] = {}
+                for target_id in splitter:
+                    for state_id in by_target.get(target_id, ()):
+                        touched.setdefault(block_of[state_id], set()).add(state_id)
+                
+                # Split every block that only partly leads into the splitter
+                for index, inside in touched.items():
+                    block = blocks[index]
+                    if len(inside) == len(block):
+                        continue
+                    # The larger half stays under the existing index and only the smaller
+                    # half is moved and relabelled, so a split costs O(|inside|). This is
+                    # what keeps the whole run at O(n·|Σ|·log n)
+                    if 2 * len(inside) <= len(block):
+                        smaller = inside
+                    else:
+                        smaller = block - inside  # At most twice as large as inside
+                    block -= smaller
+                    blocks.append(smaller)
+                    for state_id in smaller:
+                        block_of[state_id] = len(blocks) - 1
+                    # Hopcroft's rule: a pending block stays pending (and both halves are
+                    # then pending), otherwise refining by the smaller half is enough
+                    worklist.add(len(blocks) - 1)
+        
+        # One representative per block, except for the dead state's block
+        representatives: Dict[int, int] = {}
+        for index, block in enumerate(blocks):
+            if dead_id not in block:
+                representatives[index] = initial_id if initial_id in block else min(block)
+        
+        transitions: Dict[Tuple[Any, Any], Any] = {}
+        for index, state_id in representatives.items():
+            for symbol_id, next_id in enumerate(table[state_id]):
+                if next_id >= 0:
+                    transitions[(states_by_id[state_id], symbols_by_id[symbol_id])] = \
+                        states_by_id[representatives[block_of[next_id]]]
+        
+        states = {states_by_id[state_id] for state_id in representatives.values()}
+        logger.debug("Minimized FSM from %d to %d states", len(table), len(states))
+        return FiniteStateMachine(
+            states=states,
+            alphabet=self._alphabet,
+            initial_state=self._initial_state,
+            final_states={state for state in states if state in self._final_states},
+            transition_function=transitions,
+            track_history=self._track_history,
+            validate_transitions=self._validate_transitions,
+        )
+    
+    @staticmethod
+    def _build_encode_table(symbol_ids: Dict[Any, int]) -> Optional[bytes]:
+        """
+        Build a bytes.translate() table mapping characters to symbol IDs.
+        
+        When the alphabet consists of single Latin-1 characters (the common case, e.g.
+        {'0', '1'}), a string input can be encoded to symbol IDs entirely in C:
+        str.encode('latin-1') followed by bytes.translate() with this table.
+        Characters outside the alphabet are mapped to _INVALID_BYTE.
+        
+        Args:
+            symbol_ids: Mapping of input symbols to their IDs
+            
+        Returns:
+            A 256-byte translation table, or None if the alphabet is not suitable
+        """
+        if len(symbol_ids) >= _INVALID_BYTE:
+            return None
         
-        # Log initialization for debugging and operational visibility
-        logger.info(f"Initialized FSM with {len(states)} states and {len(alphabet)} input symbols")
+        table = bytearray([_INVALID_BYTE]) * 256
+        for symbol, symbol_id in symbol_ids.items():
+            if not isinstance(symbol, str) or len(symbol) != 1 or ord(symbol) > 0xFF:
+                return None
+            table[ord(symbol)] = symbol_id
+        return bytes(table)
     
     @property
     def current_state(self) -> Any:
@@ -202,13 +680,18 @@ class FiniteStateMachine:
         
         This is a convenience method that simplifies checking the acceptance condition.
         
+        Once compiled, this is a single index into a precomputed per-state flag vector
+        instead of a set lookup that has to hash the state.
+        
         Returns:
             True if the current state is a final/accepting state, False otherwise
         """
+        if self._table is not None:
+            return self._is_final[self._current_id]
         return self._current_state in self._final_states
     
     @property
-    def state_history(self) -> list:
+    def state_history(self) -> Tuple[Any, ...]:
         """
         Get the history of states visited.
         
@@ -217,10 +700,25 @@ class FiniteStateMachine:
         2. Analysis: Understanding the path taken through the state space
         3. Visualization: Creating diagrams of state transitions
         
+        The history is returned as an immutable snapshot, which is cached until the next
+        transition or reset. Reading it repeatedly (e.g. in a visualization loop) is
+        therefore O(1) as long as the FSM has not moved in between.
+        
         Returns:
-            A copy of the history list to prevent external modification
+            A tuple of the states visited, starting with the initial state
+            
+        Raises:
+            FSMException: If the FSM was created with track_history=False
         """
-        return self._history.copy()  # Return a copy to prevent external modification
+        if not self._track_history:
+            raise FSMException("State history is not tracked; create the FSM with track_history=True")
+        if self._history_snapshot is None:
+            if self._table is not None:
+                # Decode the compact ID history only when it is actually requested
+                self._history_snapshot = tuple(map(self._states_by_id.__getitem__, self._history))
+            else:
+                self._history_snapshot = tuple(self._history)
+        return self._history_snapshot
     
     def reset(self) -> None:
         """
@@ -234,8 +732,30 @@ class FiniteStateMachine:
         The method resets both the current state and the state history.
         """
         self._current_state = self._initial_state
-        self._history = [self._initial_state]
-        logger.debug("FSM reset to initial state")  # Log the reset for debugging
+        if self._table is not None:
+            self._current_id = self._state_ids[self._initial_state]
+            self._history = self._new_history([self._current_id])
+        else:
+            self._history = [self._initial_state]
+        self._history_snapshot = None
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("FSM reset to initial state")  # Log the reset for debugging
+    
+    def copy(self) -> 'FiniteStateMachine':
+        """
+        Create an independent copy of the FSM, in the same state and with the same history.
+        
+        Copying is much cheaper than constructing an equal FSM: the definition and the
+        compiled table are never modified once built, so they are shared rather than
+        validated and compiled again. Only the state history is duplicated.
+        
+        Returns:
+            A new FSM that can be stepped without affecting this one
+        """
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone._history = self._history[:]  # The only component that is changed in place
+        return clone
     
     def process_input(self, input_sequence: Iterable) -> Any:
         """
@@ -256,16 +776,50 @@ class FiniteStateMachine:
             
         Raises:
             InvalidInputError: If any input symbol is not in the alphabet
-            InvalidStateError: If any transition leads to an invalid state
+            InvalidStateError: If any transition leads to an invalid state (checked for callable
+                               transition functions only with validate_transitions=True)
             InvalidTransitionError: If a transition is undefined
         """
-        for i, input_symbol in enumerate(input_sequence):
+        # One-shot iterators are materialized, since reporting an invalid input needs a second scan
+        if not isinstance(input_sequence, (str, bytes, list, tuple)):
+            input_sequence = tuple(input_sequence)
+        
+        # Nothing to do for an empty input - the FSM stays in its current state
+        if not input_sequence:
+            return self._current_state
+        
+        # Use the table-driven fast path if the FSM has been compiled
+        if self._table is not None:
+            return self._process_compiled(input_sequence)
+        
+        # Check the log level once, so disabled debug logging costs nothing per symbol
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        
+        # Hoist attribute lookups out of the loop - local variable access is much cheaper
+        states = self._states
+        validate_transitions = self._validate_transitions
+        alphabet = self._alphabet
+        alphabet_ids = self._alphabet_ids
+        transition_func = self._transition_func
+        assert transition_func is not None  # Dictionaries are always compiled
+        history_append = self._history.append if self._track_history else None
+        self._history_snapshot = None
+        
+        # Strings can be validated in one go: the set of distinct characters is usually tiny,
+        # so this is O(unique symbols) of hashing instead of one lookup per symbol
+        prevalidated = isinstance(input_sequence, (str, bytes))
+        if prevalidated and not alphabet.issuperset(input_sequence):
+            raise _invalid_input_error(input_sequence, alphabet.__contains__)
+        
+        # No enumerate() here: the position is only needed for the error message, and the
+        # first invalid symbol can be located by rescanning the input when that happens
+        for input_symbol in input_sequence:
             # Validate that the input symbol is in the alphabet
-            if input_symbol not in self._alphabet:
-                raise InvalidInputError(f"Invalid input symbol '{input_symbol}' at position {i}")
+            if not prevalidated and id(input_symbol) not in alphabet_ids and input_symbol not in alphabet:
+                raise _invalid_input_error(input_sequence, alphabet.__contains__)
                 
             # Apply the transition function to get the next state
-            next_state = self._transition_func(self._current_state, input_symbol)
+            next_state = transition_func(self._current_state, input_symbol)
             
             # Check if the transition is defined
             if next_state is None:
@@ -273,30 +827,271 @@ class FiniteStateMachine:
                     f"No transition defined for state '{self._current_state}' and input '{input_symbol}'"
                 )
             
-            # Validate that the next state is in the set of states
-            if next_state not in self._states:
+            # Validate that the next state is in the set of states (opt-in, see __init__)
+            if validate_transitions and next_state not in states:
                 raise InvalidStateError(f"Transition to invalid state '{next_state}'")
                 
-            # Log the transition for debugging
-            logger.debug(f"Transition: {self._current_state} --({input_symbol})--> {next_state}")
+            # Log the transition for debugging (lazy %-formatting avoids building the message)
+            if debug_enabled:
+                logger.debug("Transition: %s --(%s)--> %s", self._current_state, input_symbol, next_state)
             
             # Update the current state and history
             self._current_state = next_state
-            self._history.append(next_state)
+            if history_append is not None:
+                history_append(next_state)
         
         # Return the final state after processing all inputs
         return self._current_state
     
+    def accepts(self, input_sequence: Iterable) -> bool:
+        """
+        Check whether the FSM accepts an input sequence, without changing its state.
+        
+        For many pattern-matching FSMs (e.g. "strings ending in 1") the state only depends
+        on the last few symbols of the input: after k symbols, every state has been led to
+        the same state, whichever one the walk started from. Such an FSM is called
+        k-definite, and for it only the last k symbols have to be walked - the rest of the
+        input is validated in C and skipped. k is looked for once per compiled table (see
+        _find_suffix_length), on the first input longer than the number of states, since
+        shorter inputs are cheaper to walk than the search; other FSMs walk the whole
+        input as usual.
+        
+        An FSM with a callable transition function that has not been compiled walks the
+        callable from the initial state instead, so it is only called for the
+        transitions the input actually makes, and the FSM is not compiled behind the
+        caller's back.
+        
+        Args:
+            input_sequence: Sequence of input symbols (e.g., string, list, tuple)
+            
+        Returns:
+            True if the input leads from the initial state to a final state, False if it
+            leads to a non-final state or hits an undefined transition
+            
+        Raises:
+            InvalidInputError: If any input symbol is not in the alphabet
+            InvalidStateError: If an uncompiled callable leads to an invalid state (checked
+                               only with validate_transitions=True, as in process_input)
+        """
+        if not isinstance(input_sequence, (str, bytes, list, tuple)):
+            input_sequence = tuple(input_sequence)
+        
+        if self._table is None:
+            # Validate the whole input first, as the compiled walk does
+            if not self._alphabet.issuperset(input_sequence):
+                raise _invalid_input_error(input_sequence, self._alphabet.__contains__)
+            transition_func = self._transition_func
+            assert transition_func is not None  # Dictionaries are always compiled
+            state = self._initial_state
+            for input_symbol in input_sequence:
+                state = transition_func(state, input_symbol)
+                if state is None:
+                    return False
+                if self._validate_transitions and state not in self._states:
+                    raise InvalidStateError(f"Transition to invalid state '{state}'")
+            return state in self._final_states
+        
+        state_id = self._state_ids[self._initial_state]
+        if input_sequence:
+            encoded = self._encode(input_sequence)
+            if self._suffix_length is None and len(encoded) > len(self._table):
+                self._suffix_length = self._find_suffix_length()
+            suffix_length = self._suffix_length
+            if suffix_length is not None and 0 <= suffix_length < len(encoded):
+                encoded = encoded[len(encoded) - suffix_length:]
+            runner = self._runner
+            assert runner is not None  # Set together with the table
+            state_id = runner(encoded, state_id)
+        
+        # The dead state (ID len(table)) stands for an undefined transition
+        return state_id < len(self._table) and self._is_final[state_id]
+    
+    def _find_suffix_length(self) -> int:
+        """
+        Find the smallest k for which the compiled FSM is k-definite.
+        
+        The reachable states are led through every symbol, one step at a time, tracking
+        the set of states each group can be in. Once every group is down to a single
+        state, the number of steps taken is k. The search gives up when:
+        1. The same groups come back, since they will then never collapse
+        2. More than n steps were taken, since a k-definite FSM with n states has k < n
+        3. It has made more than _MAX_SUFFIX_WORK transition lookups, which bounds it at
+           a few milliseconds even when the groups stay large for many steps
+        
+        Returns:
+            k, or -1 if the FSM is not definite
+        """
+        table = self._table
+        assert table is not None  # Only called once compiled
+        dead_id = len(table)
+        rows = [[dead_id if next_id < 0 else next_id for next_id in row] for row in table]
+        rows.append([dead_id] * len(self._symbols_by_id))
+        
+        # States reachable from the initial state, including the dead state if it is
+        reachable = {self._state_ids[self._initial_state]}
+        stack = list(reachable)
+        while stack:
+            for next_id in rows[stack.pop()]:
+                if next_id not in reachable:
+                    reachable.add(next_id)
+                    stack.append(next_id)
+        
+        groups = {frozenset(reachable)}
+        seen = set()
+        work = 0
+        for depth in range(len(rows) + 1):
+            # Single states stay single states, so only larger groups are followed
+            groups = {group for group in groups if len(group) > 1}
+            if not groups:
+                return depth
+            step = frozenset(groups)
+            if step in seen:
+                break
+            seen.add(step)
+            work += sum(map(len, groups)) * len(self._symbols_by_id)
+            if work > _MAX_SUFFIX_WORK:
+                break
+            groups = {
+                frozenset(rows[state_id][symbol_id] for state_id in group)
+                for group in groups
+                for symbol_id in range(len(self._symbols_by_id))
+            }
+        return -1
+    
+    def _encode(self, input_sequence: Union[str, bytes, list, tuple]) -> Sequence[int]:
+        """
+        Encode a sequence of input symbols to symbol IDs, validating it in the same pass.
+        
+        Args:
+            input_sequence: Sequence of input symbols (string, bytes, list or tuple)
+            
+        Returns:
+            The symbol IDs, as bytes for strings over a single-character alphabet and as a
+            list otherwise
+            
+        Raises:
+            InvalidInputError: If any input symbol is not in the alphabet
+        """
+        symbol_ids = self._symbol_ids
+        
+        if self._encode_table is not None and isinstance(input_sequence, str):
+            # Single-character alphabet: encode the string to symbol IDs with two C-level
+            # passes, and validate it with a single scan for the sentinel byte
+            try:
+                encoded = input_sequence.encode('latin-1').translate(self._encode_table)
+            except UnicodeEncodeError:
+                raise _invalid_input_error(input_sequence, symbol_ids.__contains__) from None
+            position = encoded.find(_INVALID_BYTE)
+            if position >= 0:
+                raise InvalidInputError(
+                    f"Invalid input symbol '{input_sequence[position]}' at position {position}"
+                )
+            return encoded
+        
+        # Encode the whole input up front with a C-level map; unknown symbols become None,
+        # so encoding doubles as validation and invalid input is rejected before any transition.
+        # Symbols are first matched by identity, then by equality if any of them is not
+        # one of the alphabet's own objects
+        encoded_list = list(map(self._symbol_ids_by_identity.get, map(id, input_sequence)))
+        if None in encoded_list:
+            encoded_list = list(map(symbol_ids.get, input_sequence))
+            if None in encoded_list:
+                raise _invalid_input_error(input_sequence, symbol_ids.__contains__)
+        return cast(List[int], encoded_list)  # None was ruled out above
+    
+    def _process_compiled(self, input_sequence: Union[str, bytes, list, tuple]) -> Any:
+        """
+        Process a sequence of input symbols using the compiled transition table.
+        
+        This is the fast path of process_input. It has the same semantics (including
+        error handling and state history), but it:
+        1. Encodes the input symbols to integer IDs in a single pass (see _encode)
+        2. Runs the integer-only transition loop in _run_table
+        3. Decodes the visited state IDs back to state objects once at the end
+        
+        Args:
+            input_sequence: Non-empty sequence of input symbols (string, bytes, list or tuple)
+            
+        Returns:
+            The final state after processing all inputs
+            
+        Raises:
+            InvalidInputError: If any input symbol is not in the alphabet
+            InvalidTransitionError: If a transition is undefined
+        """
+        table, runner = self._table, self._runner
+        assert table is not None and runner is not None  # Only called once compiled
+        encoded = self._encode(input_sequence)
+        
+        # Visited state IDs are only needed for the history or the debug log. The history is
+        # an array of IDs, so the loop can append to it directly with no decoding step
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        visited: Optional[_StateIds]
+        if self._track_history:
+            history = self._history
+            assert not isinstance(history, list)  # Compiled histories hold state IDs
+            visited = history
+            self._history_snapshot = None
+        else:
+            visited = self._new_history() if debug_enabled else None
+        start = len(visited) if visited is not None else 0
+        # Use the specialized loop, and only fall back to the checked loop to locate the
+        # failure if an undefined transition was hit. The specialized loop records the
+        # dead state too, so those entries are dropped before walking again
+        state_id = runner(encoded, self._current_id, visited)
+        failed_at = -1
+        if state_id == len(table):
+            if visited is not None:
+                del visited[start:]
+            state_id, failed_at = _run_table(table, encoded, self._current_id, visited)
+        
+        # The transitions that were made are kept, even if the walk stopped early
+        states_by_id = self._states_by_id
+        if debug_enabled:
+            # Replay the walk for the log; this only costs anything when debugging
+            assert visited is not None  # Always recorded when debugging
+            previous = self._current_state
+            for symbol_id, visited_id in zip(encoded, visited[start:]):
+                next_state = states_by_id[visited_id]
+                logger.debug("Transition: %s --(%s)--> %s", previous, self._symbols_by_id[symbol_id], next_state)
+                previous = next_state
+        self._current_id = state_id
+        self._current_state = states_by_id[state_id]
+        
+        if failed_at >= 0:
+            raise InvalidTransitionError(
+                f"No transition defined for state '{self._current_state}' "
+                f"and input '{self._symbols_by_id[encoded[failed_at]]}'"
+            )
+        
+        return self._current_state
+    
     def process_single_input(self, input_symbol: Any) -> Any:
         """
         Process a single input symbol and return the new state.
         
-        This is a convenience method that:
-        1. Wraps the input symbol in a list
-        2. Calls the process_input method
-        3. Returns the result
+        This is a convenience method for driving the FSM one symbol at a time (as the
+        demos do). It performs a single step directly, without wrapping the symbol in a
+        list and going through the loop machinery of process_input.
         
-        This simplifies processing a single input symbol without creating a list.
+        Args:
+            input_symbol: A single input symbol
+            
+        Returns:
+            The new state after processing the input
+            
+        Raises:
+            InvalidInputError: If the input symbol is not in the alphabet
+            InvalidStateError: If the transition leads to an invalid state
+            InvalidTransitionError: If the transition is undefined
+        """
+        return self._step(input_symbol)
+    
+    def _step(self, input_symbol: Any) -> Any:
+        """
+        Apply a single transition, with the same validation as process_input.
+        
+        Uses the compiled table when available, and the transition function otherwise.
         
         Args:
             input_symbol: A single input symbol
@@ -309,7 +1104,44 @@ class FiniteStateMachine:
             InvalidStateError: If the transition leads to an invalid state
             InvalidTransitionError: If the transition is undefined
         """
-        return self.process_input([input_symbol])
+        current_state = self._current_state
+        
+        if self._table is not None:
+            symbol_id = self._symbol_ids_by_identity.get(id(input_symbol))
+            if symbol_id is None:
+                symbol_id = self._symbol_ids.get(input_symbol)
+            if symbol_id is None:
+                raise InvalidInputError(f"Invalid input symbol '{input_symbol}' at position 0")
+            next_id = self._table[self._current_id][symbol_id]
+            if next_id >= 0:
+                next_state = self._states_by_id[next_id]
+                self._current_id = next_id
+            else:
+                next_state = None
+            history_entry = next_id
+        else:
+            if id(input_symbol) not in self._alphabet_ids and input_symbol not in self._alphabet:
+                raise InvalidInputError(f"Invalid input symbol '{input_symbol}' at position 0")
+            transition_func = self._transition_func
+            assert transition_func is not None  # Dictionaries are always compiled
+            next_state = transition_func(current_state, input_symbol)
+            if self._validate_transitions and next_state is not None and next_state not in self._states:
+                raise InvalidStateError(f"Transition to invalid state '{next_state}'")
+            history_entry = next_state
+        
+        if next_state is None:
+            raise InvalidTransitionError(
+                f"No transition defined for state '{current_state}' and input '{input_symbol}'"
+            )
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Transition: %s --(%s)--> %s", current_state, input_symbol, next_state)
+        
+        self._current_state = next_state
+        if self._track_history:
+            self._history.append(history_entry)
+            self._history_snapshot = None
+        return next_state
     
     def __str__(self) -> str:
         """
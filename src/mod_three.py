@@ -33,12 +33,26 @@ Author: Muhammad Tariq
 Date: 2025-05-04
 """
 
+from array import array
 from enum import Enum  # Used for creating strongly typed states with associated values
+from itertools import product
 import logging
-from typing import Dict, Tuple  # Type hints for better IDE support and code clarity
+from typing import Dict, FrozenSet, Iterable, List, Tuple  # Type hints for better IDE support and code clarity
 
 from src.finite_state_machine import FiniteStateMachine, InvalidInputError
 
+try:
+    # Optional compiled transition loop - see src/_fsm_core.pyx for how to build it
+    from src._fsm_core import run_table as _native_run_table  # type: ignore[import-not-found]
+except ImportError:
+    _native_run_table = None
+
+try:
+    # Optional mod-three kernel - see src/_mod_three_core.pyx for how to build it
+    from src._mod_three_core import compute_remainder as _native_compute_remainder  # type: ignore[import-not-found]
+except ImportError:
+    _native_compute_remainder = None
+
 # Configure logging for this module
 logger = logging.getLogger(__name__)
 
@@ -63,6 +77,204 @@ class ModThreeState(Enum):
     S2 = 2  # Remainder 2
 
 
+# The TRANSITIONS table below flattened into integers: the next state for
+# (state, digit) is _TRANSITION_LUT[(state << 1) | digit], where states are
+# numbered by their remainder. Rows are S0, S1, S2; columns are '0', '1'.
+# A tuple index is the cheapest transition CPython offers here: packing the table
+# into one int and extracting with (0b100100100100 >> (index << 1)) & 3 is ~60%
+# slower per digit, computing ((state << 1) | digit) % 3 is ~30% slower, and even
+# a bytes table such as b'\x00\x01\x02\x00\x01\x02' is ~20% slower, as CPython
+# specializes subscripting a tuple but not a bytes object.
+_TRANSITION_LUT: Tuple[int, ...] = (
+    0, 1,  # S0
+    2, 0,  # S1
+    1, 2,  # S2
+)
+
+# The number of the initial state S0. Reading ModThreeState.S0.value goes through
+# the Enum machinery (~240ns), so the table walks start from this plain int instead
+_INITIAL_STATE = ModThreeState.S0.value
+
+def _is_binary(text: str) -> bool:
+    """
+    Check whether a string consists only of the digits '0' and '1'.
+    
+    The check is a single C-level pass: the string is encoded to ASCII and every
+    '0' and '1' is deleted with bytes.translate, which leaves nothing for a valid
+    string. This is ~10x faster than counting the digits with str.count and ~40x
+    faster than a set comparison.
+    
+    Args:
+        text: The string to check
+        
+    Returns:
+        True if every character is '0' or '1' (including for an empty string), False
+        otherwise or if text is not a string at all
+    """
+    try:
+        return not text.encode('ascii').translate(None, b'01')
+    except UnicodeEncodeError:
+        # Non-ASCII characters can never be binary digits
+        return False
+    except AttributeError:
+        # Not a string (e.g. bytes), so it is rejected as invalid input
+        return False
+
+
+def _validate_batch(binary_strings: Iterable[str]) -> List[str]:
+    """
+    Validate the inputs of the batch functions together.
+    
+    The strings are joined and checked with a single _is_binary pass, rather than
+    encoding and translating each one separately. Any input that is not a string is
+    rejected with the same ValueError as mod_three and compute_remainder raise for it.
+    
+    Args:
+        binary_strings: Strings of '0's and '1's representing binary numbers
+        
+    Returns:
+        The inputs as a list, so generators can be consumed only once
+        
+    Raises:
+        ValueError: If any input is empty, is not a string or contains invalid characters
+    """
+    binary_strings = list(binary_strings)
+    
+    if not all(binary_strings):
+        raise ValueError("Input binary string cannot be empty")
+    
+    try:
+        joined = ''.join(binary_strings)
+    except TypeError:
+        # str.join rejects any item that is not a string
+        joined = None
+    if joined is None or not _is_binary(joined):
+        raise ValueError("Input must contain only '0's and '1's")
+    
+    return binary_strings
+
+
+# _TRANSITION_LUT is already laid out as the flat table the compiled core expects
+# (row width 2), and this maps the ASCII digits to their column numbers
+_NATIVE_TABLE = array('i', _TRANSITION_LUT)
+_DIGIT_COLUMNS = bytes.maketrans(b'01', b'\x00\x01')
+# The compiled core's sink flags: none of the three states is a sink (a state no digit leaves)
+_NATIVE_SINKS = bytes(len(ModThreeState))
+
+# Number of digits consumed per step by compute_remainder
+_CHUNK_WIDTH = 8
+
+
+def _run_lut(state: int, digits: str) -> int:
+    """
+    Run the single-digit lookup table over a string of binary digits.
+    
+    Args:
+        state: The state number to start from
+        digits: A string of '0's and '1's, already validated
+        
+    Returns:
+        The state number after processing all the digits
+    """
+    # Iterating over the ASCII bytes yields small ints directly, avoiding a one-character
+    # str object and an ord() call per digit. b'0' and b'1' (48 and 49) differ only in
+    # the lowest bit, so digit & 1 is the digit's value.
+    lut = _TRANSITION_LUT  # Local lookups are faster than global ones in the loop
+    for digit in digits.encode('ascii'):
+        state = lut[(state << 1) | (digit & 1)]
+    return state
+
+
+def _compose_transitions(width: int) -> List[Dict[str, int]]:
+    """
+    Build the transition table for blocks of several digits at once.
+    
+    Composing the single-digit transition function with itself width times gives a
+    table that maps (state, block of width digits) straight to the resulting state:
+    _compose_transitions(width)[state][block]. Walking it takes one lookup per block
+    instead of one per digit.
+    
+    Args:
+        width: Number of digits in each block
+        
+    Returns:
+        One dictionary per state number, mapping every block of width digits to the
+        state the FSM ends in after processing that block
+    """
+    blocks = [''.join(digits) for digits in product('01', repeat=width)]
+    return [{block: _run_lut(state, block) for block in blocks} for state in range(len(ModThreeState))]
+
+
+# The mod-three transition function applied _CHUNK_WIDTH times (3 x 256 entries)
+_CHUNK_TRANSITIONS = _compose_transitions(_CHUNK_WIDTH)
+
+
+def _remainder(binary_string: str) -> int:
+    """
+    Run a binary string through the mod-three transition table, starting from S0.
+    
+    This is the computation behind ModThreeFSM.compute_remainder, using the fastest
+    walk available:
+    1. The optional mod-three kernel (src/_mod_three_core.pyx), which also validates
+    2. Otherwise, validation followed by _walk
+    
+    Args:
+        binary_string: A non-empty string
+        
+    Returns:
+        The remainder (0, 1, or 2), or -1 if the string contains anything other
+        than '0's and '1's, or is not a string
+    """
+    if _native_compute_remainder is not None:
+        # Validation and the table walk both happen in one compiled call
+        try:
+            return _native_compute_remainder(binary_string.encode('ascii'))
+        except (UnicodeEncodeError, AttributeError):
+            # Non-ASCII characters can never be binary digits, and non-strings are invalid
+            return -1
+    
+    # Validate the whole string once, so the walk needs no checks
+    if not _is_binary(binary_string):
+        return -1
+    
+    return _walk(binary_string)
+
+
+def _walk(binary_string: str) -> int:
+    """
+    Run an already validated binary string through the mod-three transition table.
+    
+    Uses the optional generic compiled core (src/_fsm_core.pyx) when it is built,
+    and otherwise the pure-Python walk over _TRANSITION_LUT and _CHUNK_TRANSITIONS.
+    
+    Args:
+        binary_string: A non-empty string of '0's and '1's
+        
+    Returns:
+        The remainder (0, 1, or 2)
+    """
+    if _native_run_table is not None:
+        # Hand the whole string to the compiled loop in one call. The check
+        # above guarantees that every byte translates to column 0 or 1.
+        columns = binary_string.encode('ascii').translate(_DIGIT_COLUMNS)
+        return _native_run_table(_NATIVE_TABLE, 2, columns, _INITIAL_STATE, _NATIVE_SINKS)
+    
+    # Walk the lookup tables instead of the generic FSM, with no dict hashing
+    # of (state, digit) tuples and no Enum members. The leading len % 8 digits
+    # go through the single-digit table, then every following block of 8 digits
+    # is a single lookup in the composed table.
+    # Bind the module globals to locals so the loop uses fast local lookups
+    tables = _CHUNK_TRANSITIONS
+    width = _CHUNK_WIDTH
+    head = len(binary_string) % width
+    state = _run_lut(_INITIAL_STATE, binary_string[:head])
+    for start in range(head, len(binary_string), width):
+        state = tables[state][binary_string[start:start + width]]
+    
+    # The state number is the remainder
+    return state
+
+
 class ModThreeFSM:
     """
     Implementation of a Finite State Machine to compute the remainder
@@ -79,6 +291,11 @@ class ModThreeFSM:
     tracking the remainder state according to the transition table.
     """
     
+    # Define the FSM components based on the formal definition. They are frozensets
+    # built once and shared by every instance, so construction allocates no sets
+    STATES: FrozenSet[ModThreeState] = frozenset(ModThreeState)  # All states in the enum
+    ALPHABET: FrozenSet[str] = frozenset('01')                     # Binary digits only
+    
     # Define the transition table as a class constant
     # The transition table is derived from mathematical analysis of how binary
     # digit position affects the remainder when divided by 3
@@ -89,6 +306,9 @@ class ModThreeFSM:
     # |  S1  |   S2   |   S0   |
     # |  S2  |   S1   |   S2   |
     # +------+--------+--------+
+    # This dictionary is only read when the FSM is built: the generic FSM compiles
+    # it into integer rows, so stepping never hashes (state, digit) tuples. The
+    # same table flattened into ints is _TRANSITION_LUT, used by compute_remainder.
     TRANSITIONS: Dict[Tuple[ModThreeState, str], ModThreeState] = {
         (ModThreeState.S0, '0'): ModThreeState.S0,  # 0 * 2^n + r0 ≡ 0 (mod 3)
         (ModThreeState.S0, '1'): ModThreeState.S1,  # 1 * 2^n + r0 ≡ 1 (mod 3)
@@ -98,36 +318,49 @@ class ModThreeFSM:
         (ModThreeState.S2, '1'): ModThreeState.S2   # 1 * 2^n + r2 ≡ 2 (mod 3)
     }
     
-    def __init__(self):
+    # Compiled FSMs in their initial state, by (class, track_history), copied by __init__
+    _templates: Dict[Tuple[type, bool], FiniteStateMachine] = {}
+    
+    def __init__(self, track_history: bool = True):
         """
         Initialize the mod-three FSM.
         
         This constructor:
-        1. Defines the components of the FSM (states, alphabet, etc.)
-        2. Creates an instance of the generic FiniteStateMachine
-        3. Logs the initialization
+        1. Creates an instance of the generic FiniteStateMachine from the
+           class-level components (STATES, ALPHABET, TRANSITIONS), by copying
+           one that was built for an earlier instance if possible
+        2. Logs the initialization at DEBUG level
         
-        No parameters are needed as the FSM configuration is fixed
-        for the mod-three problem.
-        """
-        # Define FSM components based on the formal definition
-        states = set(ModThreeState)  # All states in the enum
-        alphabet = {'0', '1'}        # Binary digits only
-        initial_state = ModThreeState.S0  # Start with remainder 0
-        final_states = set(ModThreeState)  # All states are final
+        The FSM configuration itself is fixed for the mod-three problem.
+        compute_remainder never records history, since only the final state
+        matters to it; track_history only affects stepping with
+        process_single_input.
         
-        # Create the FSM using the class-level transition table
+        Args:
+            track_history: Whether to record every visited state in state_history.
+                           Disable it when stepping through long inputs without
+                           needing the history.
+        """
+        # Create the FSM from the class-level components and transition table
         # Using the generic FiniteStateMachine class leverages code reuse
-        # and separation of concerns
-        self._fsm = FiniteStateMachine(
-            states=states,
-            alphabet=alphabet,
-            initial_state=initial_state,
-            final_states=final_states,
-            transition_function=self.TRANSITIONS
-        )
+        # and separation of concerns. Since the components never change, the FSM is
+        # only validated and compiled once per class and option; every instance gets
+        # its own copy of it, which takes a fraction of the time
+        key = (type(self), track_history)
+        template = ModThreeFSM._templates.get(key)
+        if template is None:
+            template = ModThreeFSM._templates[key] = FiniteStateMachine(
+                states=self.STATES,
+                alphabet=self.ALPHABET,
+                initial_state=ModThreeState.S0,  # Start with remainder 0
+                final_states=self.STATES,        # All states are final
+                transition_function=self.TRANSITIONS,
+                track_history=track_history
+            )
+        self._fsm = template.copy()
         
-        logger.info("Initialized Mod-Three FSM")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Initialized Mod-Three FSM")
     
     @property
     def current_state(self) -> ModThreeState:
@@ -146,7 +379,7 @@ class ModThreeFSM:
         return self._fsm.current_state
     
     @property
-    def state_history(self) -> list:
+    def state_history(self) -> Tuple[ModThreeState, ...]:
         """
         Get the history of states visited.
         
@@ -157,7 +390,10 @@ class ModThreeFSM:
         3. Understanding how the FSM arrived at its result
         
         Returns:
-            A list of ModThreeState enum values representing the state history
+            A tuple of ModThreeState enum values representing the state history
+            
+        Raises:
+            FSMException: If the FSM was created with track_history=False
         """
         return self._fsm.state_history
     
@@ -201,14 +437,22 @@ class ModThreeFSM:
         
         This method:
         1. Validates the input
-        2. Resets the FSM to its initial state
-        3. Processes each digit in the binary string
-        4. Returns the remainder based on the final state
+        2. Runs the transition table over the digits, starting from S0
+        3. Returns the remainder based on the final state
         
         The method leverages the FSM to determine the remainder without
         converting the binary string to an integer, allowing it to handle
         binary strings of arbitrary length.
         
+        For speed, the digits are run through _TRANSITION_LUT, the integer form of
+        TRANSITIONS, and through _CHUNK_TRANSITIONS, which applies it to 8 digits at a
+        time, rather than through the generic FSM. The computation therefore does not
+        change current_state or state_history; use reset() and process_single_input()
+        to step through the machine.
+        
+        When an optional compiled extension is built, the walk runs in C instead
+        (see _remainder).
+        
         Args:
             binary_string: A string of '0's and '1's representing a binary number
             
@@ -216,24 +460,38 @@ class ModThreeFSM:
             The remainder when the binary number is divided by 3 (0, 1, or 2)
             
         Raises:
-            ValueError: If the input string is empty or contains invalid characters
+            ValueError: If the input is empty, is not a string or contains invalid characters
         """
         if not binary_string:
             raise ValueError("Input binary string cannot be empty")
+        
+        remainder = _remainder(binary_string)
+        if remainder < 0:
+            raise ValueError("Input must contain only '0's and '1's")
+        return remainder
+    
+    def compute_remainders(self, binary_strings: Iterable[str]) -> List[int]:
+        """
+        Compute the remainders of several binary numbers divided by 3.
+        
+        This is the batch form of compute_remainder, with the same validation and
+        the same (state-preserving) computation for each input. The inputs are
+        validated together, with a single _is_binary pass over the joined strings,
+        and the table walk is then mapped over them without further checks.
+        
+        Args:
+            binary_strings: Strings of '0's and '1's representing binary numbers
             
-        try:
-            # Reset the FSM to its initial state
-            self._fsm.reset()
-            
-            # Process each digit in the binary string
-            final_state = self._fsm.process_input(binary_string)
-            
-            # The value of the final state is the remainder
-            return final_state.value
+        Returns:
+            The remainders (each 0, 1, or 2), in the same order as the inputs
             
-        except InvalidInputError:
-            # Convert the generic FSM error to a more specific error for this context
-            raise ValueError("Input must contain only '0's and '1's")
+        Raises:
+            ValueError: If any input is empty, is not a string or contains invalid characters
+        """
+        binary_strings = _validate_batch(binary_strings)
+        
+        # The compiled kernel validates as it walks, so there is no unchecked form of it
+        return list(map(_remainder if _native_compute_remainder is not None else _walk, binary_strings))
     
     def __str__(self) -> str:
         """
@@ -263,11 +521,19 @@ def mod_three(binary_string: str) -> int:
     """
     Convenience function to compute the remainder when a binary number is divided by 3.
     
-    This function provides a simple interface to the ModThreeFSM class:
+    This function provides a simple interface for the most common use case:
     1. It validates the input
-    2. Creates a ModThreeFSM instance
-    3. Computes the remainder
-    4. Returns the result
+    2. Computes the state the mod-three FSM would finish in
+    3. Returns that state's remainder
+    
+    Instead of stepping through the FSM digit by digit, it uses the closed form of
+    the FSM's transitions. Since 2 ≡ -1 (mod 3), the powers of 2 alternate between
+    1 and -1 mod 3 (see the module docstring), so the final state is the number of
+    '1's in even positions minus the number of '1's in odd positions, counting
+    positions from the right. These counts are C-level str operations, so there is
+    no per-digit Python work, and the string is never converted to an integer.
+    int(binary_string, 2) % 3 is avoided for the same reason: it also accepts
+    inputs such as '0b101', '1_0' or ' 101 '.
     
     This simplifies the most common use case without requiring the user
     to create and manage a ModThreeFSM instance.
@@ -279,13 +545,50 @@ def mod_three(binary_string: str) -> int:
         The remainder when the binary number is divided by 3 (0, 1, or 2)
         
     Raises:
-        ValueError: If the input is empty or contains invalid characters
+        ValueError: If the input is empty, is not a string or contains invalid characters
     """
     if not binary_string:
         raise ValueError("Input binary string cannot be empty")
-        
-    if not all(bit in '01' for bit in binary_string):
+    
+    if not _is_binary(binary_string):
         raise ValueError("Input must contain only '0's and '1's")
+    
+    # The counts cost a few hundred ns even for short inputs, so there is no separate
+    # path for common lengths: a table walk unrolled for 32 digits (generated with
+    # exec) measured ~1.7us against ~0.46us here, and the gap grows with length
+    ones = binary_string.count('1')
+    
+    # binary_string[::-2] holds the digits in even positions, counting from the right
+    even_ones = binary_string[::-2].count('1')
+    
+    # even_ones - (ones - even_ones) is the alternating sum of the digits
+    return (2 * even_ones - ones) % 3
+
+
+def mod_three_many(binary_strings: Iterable[str]) -> List[int]:
+    """
+    Compute the remainder of each of several binary numbers divided by 3.
+    
+    This is the batch form of mod_three, for callers with many inputs:
+    1. It validates all the inputs together
+    2. Computes each remainder with the same closed form as mod_three
+    3. Returns the remainders in input order
+    
+    Validating the batch at once amortizes the fixed per-call costs: the
+    strings are joined and checked with a single _is_binary pass, rather than
+    encoding and translating each one separately, and the remainders come from
+    one list comprehension instead of one function call per string.
+    
+    Args:
+        binary_strings: Strings of '0's and '1's representing binary numbers
+        
+    Returns:
+        The remainders (each 0, 1, or 2), in the same order as the inputs
         
-    fsm = ModThreeFSM()
-    return fsm.compute_remainder(binary_string)
\ No newline at end of file
+    Raises:
+        ValueError: If any input is empty, is not a string or contains invalid characters
+    """
+    binary_strings = _validate_batch(binary_strings)
+    
+    # See mod_three: '1's in even positions minus '1's in odd positions, mod 3
+    return [(2 * digits[::-2].count('1') - digits.count('1')) % 3 for digits in binary_strings]
@@ -0,0 +1,28 @@
+"""
+Tests for the Finite State Machine project, and helpers shared by the test modules.
+"""
+
+
+def recording_run_table(calls):
+    """
+    Build a pure-Python stand-in for run_table in src/_fsm_core.pyx.
+    
+    The stand-in has the same contract as the compiled core, so the wiring of the
+    optional core can be tested without building it.
+    
+    Args:
+        calls: List that receives the encoded input buffer of every call
+        
+    Returns:
+        A function run_table(table, num_symbols, encoded, state_id, is_sink)
+    """
+    def run_table(table, num_symbols, encoded, state_id, is_sink):
+        calls.append(encoded)
+        for start in range(0, len(encoded), 256):
+            for symbol_id in encoded[start:start + 256]:
+                state_id = table[state_id * num_symbols + symbol_id]
+            if is_sink[state_id]:
+                break
+        return state_id
+    
+    return run_table
@@ -9,28 +9,36 @@ Date: 2025-05-04
 """
 
 import unittest
+from itertools import product
+from unittest import mock
 from typing import Dict, Tuple, Any
 
+from src import finite_state_machine
 from src.finite_state_machine import (
     FiniteStateMachine,
+    FSMException,
     InvalidStateError,
     InvalidInputError,
     InvalidTransitionError
 )
+from tests import recording_run_table
 
 
 class SimpleState:
     """Simple state class for testing."""
     def __init__(self, name):
         self.name = name
+        self._hash = hash(name)  # Computed once, since states are hashed on every dict lookup
         
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, SimpleState):
             return False
         return self.name == other.name
         
     def __hash__(self):
-        return hash(self.name)
+        return self._hash
         
     def __repr__(self):
         return f"SimpleState({self.name})"
@@ -79,7 +87,7 @@ class TestFiniteStateMachine(unittest.TestCase):
         self.assertFalse(self.fsm.is_in_final_state)
         
         # State history should contain only the initial state
-        self.assertEqual(self.fsm.state_history, [self.state_a])
+        self.assertEqual(self.fsm.state_history, (self.state_a,))
 
     def test_initialization_errors(self):
         """Test that initialization errors are raised correctly."""
@@ -104,6 +112,30 @@ class TestFiniteStateMachine(unittest.TestCase):
                 transition_function=self.transitions
             )
         
+        # Test with a transition on an input not in the alphabet
+        invalid_transitions = self.transitions.copy()
+        invalid_transitions[(self.state_a, '2')] = self.state_b
+        with self.assertRaises(InvalidInputError):
+            FiniteStateMachine(
+                states=self.states,
+                alphabet=self.alphabet,
+                initial_state=self.initial_state,
+                final_states=self.final_states,
+                transition_function=invalid_transitions
+            )
+        
+        # Test with a transition to a state not in states
+        invalid_transitions = self.transitions.copy()
+        invalid_transitions[(self.state_a, '0')] = invalid_state
+        with self.assertRaises(InvalidStateError):
+            FiniteStateMachine(
+                states=self.states,
+                alphabet=self.alphabet,
+                initial_state=self.initial_state,
+                final_states=self.final_states,
+                transition_function=invalid_transitions
+            )
+        
         # Test with invalid transition
         invalid_transitions = self.transitions.copy()
         invalid_transitions[(invalid_state, '0')] = self.state_a
@@ -115,6 +147,28 @@ class TestFiniteStateMachine(unittest.TestCase):
                 final_states=self.final_states,
                 transition_function=invalid_transitions  # Invalid transition
             )
+        
+        # Test with components that are not sets
+        with self.assertRaises(TypeError):
+            FiniteStateMachine(
+                states=list(self.states),  # Not a set
+                alphabet=self.alphabet,
+                initial_state=self.initial_state,
+                final_states=self.final_states,
+                transition_function=self.transitions
+            )
+    
+    def test_frozenset_components(self):
+        """Test that frozensets are accepted for the states, alphabet and final states."""
+        fsm = FiniteStateMachine(
+            states=frozenset(self.states),
+            alphabet=frozenset(self.alphabet),
+            initial_state=self.initial_state,
+            final_states=frozenset(self.final_states),
+            transition_function=self.transitions
+        )
+        self.assertEqual(fsm.process_input('01'), self.state_b)
+        self.assertTrue(fsm.is_in_final_state)
     
     def test_process_input(self):
         """Test processing input sequences."""
@@ -159,6 +213,15 @@ class TestFiniteStateMachine(unittest.TestCase):
         self.fsm.reset()
         result = self.fsm.process_single_input('1')
         self.assertEqual(result, self.state_b)
+        
+        # Steps accumulate in the history just like process_input
+        self.fsm.process_single_input('0')
+        self.assertEqual(self.fsm.state_history, (self.state_a, self.state_b, self.state_a))
+        
+        # Invalid symbols are rejected without changing state
+        with self.assertRaises(InvalidInputError):
+            self.fsm.process_single_input('2')
+        self.assertEqual(self.fsm.current_state, self.state_a)
     
     def test_state_history(self):
         """Test that state history is tracked correctly."""
@@ -166,14 +229,38 @@ class TestFiniteStateMachine(unittest.TestCase):
         self.fsm.reset()
         self.fsm.process_input('010')
         
-        expected_history = [
+        expected_history = (
             self.state_a,  # Initial state
             self.state_a,  # After '0'
             self.state_b,  # After '1'
             self.state_a   # After '0'
-        ]
+        )
         
         self.assertEqual(self.fsm.state_history, expected_history)
+        
+        # The snapshot is reused until the FSM moves again
+        self.assertIs(self.fsm.state_history, self.fsm.state_history)
+        self.fsm.process_single_input('1')
+        self.assertEqual(self.fsm.state_history, expected_history + (self.state_b,))
+    
+    def test_history_tracking_disabled(self):
+        """Test that an FSM without history tracking still processes input correctly."""
+        for transition_function in (self.transitions, lambda state, symbol: self.transitions[(state, symbol)]):
+            fsm = FiniteStateMachine(
+                states=self.states,
+                alphabet=self.alphabet,
+                initial_state=self.initial_state,
+                final_states=self.final_states,
+                transition_function=transition_function,
+                track_history=False
+            )
+            
+            self.assertEqual(fsm.process_input('0101'), self.state_b)
+            self.assertTrue(fsm.is_in_final_state)
+            
+            # The history is not available when it is not tracked
+            with self.assertRaises(FSMException):
+                fsm.state_history
     
     def test_reset(self):
         """Test resetting the FSM."""
@@ -184,7 +271,20 @@ class TestFiniteStateMachine(unittest.TestCase):
         # Reset and check state
         self.fsm.reset()
         self.assertEqual(self.fsm.current_state, self.state_a)
-        self.assertEqual(self.fsm.state_history, [self.state_a])
+        self.assertEqual(self.fsm.state_history, (self.state_a,))
+    
+    def test_copy(self):
+        """Test that a copy continues from the same state independently."""
+        self.fsm.process_input('01')
+        clone = self.fsm.copy()
+        self.assertEqual(clone.current_state, self.state_b)
+        self.assertEqual(clone.state_history, self.fsm.state_history)
+        
+        clone.process_input('0')
+        self.assertEqual(clone.current_state, self.state_a)
+        self.assertEqual(len(clone.state_history), 4)
+        self.assertEqual(self.fsm.current_state, self.state_b)
+        self.assertEqual(len(self.fsm.state_history), 3)
     
     def test_error_handling(self):
         """Test error handling for invalid inputs and transitions."""
@@ -195,6 +295,16 @@ class TestFiniteStateMachine(unittest.TestCase):
         # Test with invalid input character in a sequence
         with self.assertRaises(InvalidInputError):
             self.fsm.process_input('01A')
+        
+        # Batch validation still reports the first invalid symbol and its position
+        with self.assertRaisesRegex(InvalidInputError, "'A' at position 2"):
+            self.fsm.process_input(['0', '1', 'A', 'B'])
+        
+        # Invalid input is rejected before any transition is made
+        self.fsm.reset()
+        with self.assertRaises(InvalidInputError):
+            self.fsm.process_input('11A')
+        self.assertEqual(self.fsm.current_state, self.state_a)
     
     def test_callable_transition_function(self):
         """Test using a callable as the transition function."""
@@ -226,6 +336,32 @@ class TestFiniteStateMachine(unittest.TestCase):
         fsm_callable.reset()
         fsm_callable.process_input('00')
         self.assertEqual(fsm_callable.current_state, self.state_a)
+        
+        # Invalid symbols from a one-shot iterator are reported with their position
+        with self.assertRaisesRegex(InvalidInputError, "'X' at position 1"):
+            fsm_callable.process_input(iter(['1', 'X', '0']))
+    
+    def test_validate_transitions(self):
+        """Test the opt-in runtime check of callable transition results."""
+        invalid_state = SimpleState("Invalid")
+        
+        def transition_func(state, input_symbol):
+            return invalid_state if input_symbol == '1' else self.state_a
+        
+        fsm = FiniteStateMachine(
+            states=self.states,
+            alphabet=self.alphabet,
+            initial_state=self.initial_state,
+            final_states=self.final_states,
+            transition_function=transition_func,
+            validate_transitions=True
+        )
+        
+        self.assertEqual(fsm.process_input('00'), self.state_a)
+        with self.assertRaises(InvalidStateError):
+            fsm.process_input('01')
+        with self.assertRaises(InvalidStateError):
+            fsm.process_single_input('1')
     
     def test_string_representations(self):
         """Test string representation methods."""
@@ -253,7 +389,446 @@ class TestFiniteStateMachine(unittest.TestCase):
         self.assertEqual(self.fsm.current_state, self.state_a)
         
         # History should only contain the initial state
-        self.assertEqual(self.fsm.state_history, [self.state_a])
+        self.assertEqual(self.fsm.state_history, (self.state_a,))
+        
+        # Other kinds of empty input sequences behave the same way
+        for empty_input in ([], (), iter([])):
+            self.assertEqual(self.fsm.process_input(empty_input), self.state_a)
+        self.assertEqual(self.fsm.state_history, (self.state_a,))
+    
+    def test_debug_logging(self):
+        """Test that transitions are logged when debug logging is enabled."""
+        with self.assertLogs('src.finite_state_machine', level='DEBUG') as logs:
+            self.fsm.process_input('01')
+        
+        transitions = [message for message in logs.output if 'Transition:' in message]
+        self.assertEqual(len(transitions), 2)
+        self.assertIn("SimpleState(A) --(1)--> SimpleState(B)", transitions[1])
+    
+    def test_compile(self):
+        """Test that a compiled FSM behaves exactly like the interpreted one."""
+        # Dictionary-based FSMs are compiled at construction
+        self.assertTrue(self.fsm.is_compiled)
+        
+        # compile() returns the FSM itself so it can be chained
+        self.assertIs(self.fsm.compile(), self.fsm)
+        self.assertTrue(self.fsm.is_compiled)
+        
+        # Same final state and history as the interpreted path
+        result = self.fsm.process_input('010')
+        self.assertEqual(result, self.state_a)
+        self.assertEqual(
+            self.fsm.state_history,
+            (self.state_a, self.state_a, self.state_b, self.state_a)
+        )
+        
+        # Non-string iterables work as well
+        self.fsm.reset()
+        self.assertEqual(self.fsm.process_input(iter(['0', '1'])), self.state_b)
+        self.assertTrue(self.fsm.is_in_final_state)
+        
+        # Invalid symbols are still rejected
+        with self.assertRaises(InvalidInputError):
+            self.fsm.process_input('01A')
+    
+    def test_compiled_string_inputs(self):
+        """Test string inputs on the compiled single-character alphabet fast path."""
+        long_input = '01' * 500 + '1'
+        self.assertEqual(self.fsm.process_input(long_input), self.state_b)
+        self.assertEqual(len(self.fsm.state_history), len(long_input) + 1)
+        
+        # Characters outside the alphabet are reported with their position,
+        # including characters that cannot be encoded as a single byte
+        for invalid_input, symbol in (('0120', '2'), ('01\u20ac', '\u20ac')):
+            self.fsm.reset()
+            with self.assertRaisesRegex(InvalidInputError, f"'{symbol}' at position 2"):
+                self.fsm.process_input(invalid_input)
+    
+    def test_multi_character_symbols(self):
+        """Test a compiled FSM whose symbols are not single characters."""
+        transitions = {
+            (self.state_a, 'go'): self.state_b,
+            (self.state_b, 'go'): self.state_a,
+            (self.state_a, 'stay'): self.state_a,
+            (self.state_b, 'stay'): self.state_b
+        }
+        fsm = FiniteStateMachine(
+            states=self.states,
+            alphabet={'go', 'stay'},
+            initial_state=self.initial_state,
+            final_states=self.final_states,
+            transition_function=transitions
+        )
+        
+        self.assertEqual(fsm.process_input(['go', 'stay', 'go', 'go']), self.state_b)
+        
+        # A string is a sequence of characters, none of which is in this alphabet
+        with self.assertRaises(InvalidInputError):
+            fsm.process_input('go')
+    
+    def test_object_symbols(self):
+        """Test symbols that are matched by identity first and by equality as a fallback."""
+        go, stay = SimpleState("go"), SimpleState("stay")
+        transitions = {
+            (self.state_a, go): self.state_b,
+            (self.state_b, go): self.state_a,
+            (self.state_a, stay): self.state_a,
+            (self.state_b, stay): self.state_b
+        }
+        
+        for compile_fsm in (False, True):
+            fsm = FiniteStateMachine(
+                states=self.states,
+                alphabet={go, stay},
+                initial_state=self.initial_state,
+                final_states=self.final_states,
+                transition_function=lambda state, symbol: transitions[(state, symbol)]
+            )
+            if compile_fsm:
+                fsm.compile()
+            
+            # The alphabet's own objects
+            self.assertEqual(fsm.process_input([go, stay, go, go]), self.state_b)
+            
+            # Equal but distinct objects are accepted too
+            self.assertEqual(fsm.process_input([SimpleState("go")]), self.state_a)
+            self.assertEqual(fsm.process_single_input(SimpleState("go")), self.state_b)
+            
+            with self.assertRaises(InvalidInputError):
+                fsm.process_input([go, SimpleState("jump")])
+    
+    def test_native_core_interface(self):
+        """Test the wiring of the optional compiled core with a pure-Python stand-in."""
+        calls = []
+        run_table = recording_run_table(calls)
+        
+        partial = {
+            (self.state_a, '0'): self.state_a,
+            (self.state_a, '1'): self.state_b,
+            (self.state_b, '1'): self.state_b
+        }
+        with mock.patch.object(finite_state_machine, '_native_run_table', run_table):
+            fsm = FiniteStateMachine(
+                states=self.states,
+                alphabet=self.alphabet,
+                initial_state=self.initial_state,
+                final_states=self.final_states,
+                transition_function=partial,
+                track_history=False
+            )
+            
+            self.assertEqual(fsm.process_input('0011'), self.state_b)
+            self.assertEqual(fsm.process_input(['1', '1']), self.state_b)
+            with self.assertRaises(InvalidTransitionError):
+                fsm.process_input('10')
+        
+        # The core always receives a byte buffer
+        self.assertEqual([type(encoded) for encoded in calls], [bytes, bytes, bytes])
+    
+    def test_compile_partial_transitions(self):
+        """Test that undefined transitions are reported by a compiled FSM."""
+        # Only define transitions out of state A
+        partial = {
+            (self.state_a, '0'): self.state_a,
+            (self.state_a, '1'): self.state_b
+        }
+        fsm = FiniteStateMachine(
+            states=self.states,
+            alphabet=self.alphabet,
+            initial_state=self.initial_state,
+            final_states=self.final_states,
+            transition_function=partial
+        )
+        
+        with self.assertRaises(InvalidTransitionError):
+            fsm.process_input('011')
+        
+        # Transitions made before the undefined one are kept
+        self.assertEqual(fsm.current_state, self.state_b)
+        self.assertEqual(fsm.state_history, (self.state_a, self.state_a, self.state_b))
+        
+        # The same holds without history
+        fsm = FiniteStateMachine(
+            states=self.states,
+            alphabet=self.alphabet,
+            initial_state=self.initial_state,
+            final_states=self.final_states,
+            transition_function=partial,
+            track_history=False
+        )
+        self.assertEqual(fsm.process_input('0001'), self.state_b)
+        fsm.reset()
+        with self.assertRaisesRegex(InvalidTransitionError, "input '0'"):
+            fsm.process_input(['0', '1', '0', '1'])
+        self.assertEqual(fsm.current_state, self.state_b)
+        self.assertTrue(fsm.is_in_final_state)
+    
+    def test_compile_many_states(self):
+        """Test the compiled history of an FSM with more states than fit in a byte."""
+        # A counter modulo 300, with an undefined transition out of its last state
+        states = set(range(300))
+        transitions = {(state, '+'): state + 1 for state in range(299)}
+        fsm = FiniteStateMachine(
+            states=states,
+            alphabet={'+'},
+            initial_state=0,
+            final_states={299},
+            transition_function=transitions
+        )
+        
+        self.assertEqual(fsm.process_input('+' * 299), 299)
+        self.assertEqual(fsm.state_history, tuple(range(300)))
+        
+        with self.assertRaises(InvalidTransitionError):
+            fsm.process_input('+')
+        self.assertEqual(fsm.state_history, tuple(range(300)))
+    
+    def test_sink_state(self):
+        """Test that the compiled walk stops early in a sink state."""
+        # The runner assertions below are about the pure-Python loop, and the optional
+        # compiled core does no bounds checks on the out-of-range symbol IDs they use, so
+        # the FSMs are built without it
+        with mock.patch.object(finite_state_machine, '_native_run_table', None):
+            fsm = FiniteStateMachine(
+                states={'a', 'trap'},
+                alphabet={'0', '1'},
+                initial_state='a',
+                final_states={'a'},
+                transition_function={('a', '0'): 'a', ('a', '1'): 'trap', ('trap', '0'): 'trap', ('trap', '1'): 'trap'},
+                track_history=False
+            )
+        
+        self.assertEqual(fsm.process_input('0' * 1000 + '1' + '01' * 1000), 'trap')
+        
+        # With history, the part after the sink is filled in with the sink
+        tracking = FiniteStateMachine(
+            states={'a', 'trap'},
+            alphabet={'0', '1'},
+            initial_state='a',
+            final_states={'a'},
+            transition_function={('a', '0'): 'a', ('a', '1'): 'trap', ('trap', '0'): 'trap', ('trap', '1'): 'trap'}
+        )
+        self.assertEqual(tracking.process_input('0' * 1000 + '1' + '01' * 1000), 'trap')
+        self.assertEqual(tracking.state_history, ('a',) * 1001 + ('trap',) * 2001)
+        
+        # The input after the sink is still validated
+        fsm.reset()
+        with self.assertRaises(InvalidInputError):
+            fsm.process_input('1' + '0' * 1000 + '2')
+        
+        # The walk stops at the first check after entering the sink: an out-of-range
+        # symbol ID in the next block is never looked up
+        interval = finite_state_machine._SINK_CHECK_INTERVAL
+        encoded = [fsm._symbol_ids['1']] * interval + [99] * interval
+        self.assertEqual(fsm._runner(encoded, fsm._state_ids['a']), fsm._state_ids['trap'])
+        
+        # The same holds for the dead state standing for undefined transitions
+        with mock.patch.object(finite_state_machine, '_native_run_table', None):
+            fsm = FiniteStateMachine(
+                states={'a'},
+                alphabet={'0', '1'},
+                initial_state='a',
+                final_states={'a'},
+                transition_function={('a', '0'): 'a'}
+            )
+        encoded = [fsm._symbol_ids['1']] * interval + [99] * interval
+        self.assertEqual(fsm._runner(encoded, 0), 1)
+        with self.assertRaises(InvalidTransitionError):
+            fsm.process_input('0' * 1000 + '1' + '0' * 1000)
+        self.assertEqual(fsm.state_history, ('a',) * 1001)
+    
+    def test_accepts(self):
+        """Test accepts against process_input, with and without a deciding suffix."""
+        # "Ends in 01": the state only depends on the last two symbols
+        ends_in_01 = FiniteStateMachine(
+            states={'', '0', '01'},
+            alphabet={'0', '1'},
+            initial_state='',
+            final_states={'01'},
+            transition_function={
+                ('', '0'): '0', ('', '1'): '',
+                ('0', '0'): '0', ('0', '1'): '01',
+                ('01', '0'): '0', ('01', '1'): ''
+            }
+        )
+        # Even number of 1s: every symbol matters
+        parity = FiniteStateMachine(
+            states={'even', 'odd'},
+            alphabet={'0', '1'},
+            initial_state='even',
+            final_states={'even'},
+            transition_function={
+                ('even', '0'): 'even', ('even', '1'): 'odd',
+                ('odd', '0'): 'odd', ('odd', '1'): 'even'
+            }
+        )
+        # Only 0s, then one optional 1: undefined transitions reject
+        partial = FiniteStateMachine(
+            states={'zeros', 'one'},
+            alphabet={'0', '1'},
+            initial_state='zeros',
+            final_states={'one'},
+            transition_function={('zeros', '0'): 'zeros', ('zeros', '1'): 'one'}
+        )
+        
+        for fsm, suffix_length in ((self.fsm, 1), (ends_in_01, 2), (parity, -1), (partial, -1)):
+            self.assertEqual(fsm._find_suffix_length(), suffix_length)
+            for length in range(8):
+                for symbols in product('01', repeat=length):
+                    fsm.reset()
+                    try:
+                        expected = fsm.process_input(symbols) in fsm._final_states
+                    except InvalidTransitionError:
+                        expected = False
+                    self.assertEqual(fsm.accepts(''.join(symbols)), expected)
+                    self.assertEqual(fsm.accepts(list(symbols)), expected)
+        
+        # The state and history are left alone, and the whole input is still validated
+        self.fsm.reset()
+        self.assertTrue(self.fsm.accepts('0' * 1000 + '1'))
+        self.assertEqual(self.fsm.current_state, self.state_a)
+        self.assertEqual(self.fsm.state_history, (self.state_a,))
+        with self.assertRaises(InvalidInputError):
+            self.fsm.accepts('2' + '0' * 1000 + '1')
+        
+        # Large FSMs without a deciding suffix: inputs no longer than the number of states
+        # skip the search, and the search gives up early once the groups repeat
+        cycle = FiniteStateMachine(
+            states=set(range(3000)),
+            alphabet={'0', '1'},
+            initial_state=0,
+            final_states={0},
+            transition_function={(state, symbol): (state + 1) % 3000 for state in range(3000) for symbol in '01'}
+        )
+        self.assertFalse(cycle.accepts('01'))
+        self.assertIsNone(cycle._suffix_length)
+        self.assertTrue(cycle.accepts('0' * 6000))
+        self.assertEqual(cycle._suffix_length, -1)
+        
+        # ...or once it has done too much work, while the groups keep changing
+        with mock.patch.object(finite_state_machine, '_MAX_SUFFIX_WORK', 1):
+            self.assertEqual(ends_in_01._find_suffix_length(), -1)
+        
+        # A callable FSM is walked as it is, without being compiled, so the callable is
+        # only called for the transitions the input makes
+        transitions = {('a', '1'): 'b', ('b', '0'): 'a'}
+        fsm = FiniteStateMachine(
+            states={'a', 'b'},
+            alphabet={'0', '1'},
+            initial_state='a',
+            final_states={'b'},
+            transition_function=lambda state, symbol: transitions[(state, symbol)]
+        )
+        self.assertTrue(fsm.accepts('1'))
+        self.assertTrue(fsm.accepts(iter('101')))
+        self.assertFalse(fsm.accepts(''))
+        self.assertFalse(fsm.is_compiled)
+        with self.assertRaises(InvalidInputError):
+            fsm.accepts('12')
+    
+    def test_compile_callable_transition_function(self):
+        """Test compiling a callable transition function."""
+        def transition_func(state, input_symbol):
+            return self.state_b if input_symbol == '1' else self.state_a
+        
+        fsm = FiniteStateMachine(
+            states=self.states,
+            alphabet=self.alphabet,
+            initial_state=self.initial_state,
+            final_states=self.final_states,
+            transition_function=transition_func
+        )
+        
+        # Callables are only compiled on request
+        self.assertFalse(fsm.is_compiled)
+        fsm.process_input('1')
+        fsm.compile()
+        self.assertTrue(fsm.is_compiled)
+        
+        # History recorded before compiling is preserved
+        self.assertEqual(fsm.process_input('0101'), self.state_b)
+        self.assertEqual(
+            fsm.state_history,
+            (self.state_a, self.state_b, self.state_a, self.state_b, self.state_a, self.state_b)
+        )
+        
+        # Compiling again is harmless
+        fsm.compile()
+        self.assertEqual(len(fsm.state_history), 6)
+        
+        # A callable leading to an unknown state is rejected at compile time
+        def invalid_func(state, input_symbol):
+            return SimpleState("Invalid")
+        
+        fsm = FiniteStateMachine(
+            states=self.states,
+            alphabet=self.alphabet,
+            initial_state=self.initial_state,
+            final_states=self.final_states,
+            transition_function=invalid_func
+        )
+        with self.assertRaises(InvalidStateError):
+            fsm.compile()
+    
+    def test_minimized(self):
+        """Test that minimization merges equivalent states and keeps the behavior."""
+        # "Ends in 1" with a duplicated accepting state, a duplicated rejecting state,
+        # an unreachable state and an undefined transition on 'x'
+        transitions = {
+            ('a', '0'): 'b', ('a', '1'): 'c', ('a', 'x'): 'b',
+            ('b', '0'): 'a', ('b', '1'): 'd', ('b', 'x'): 'a',
+            ('c', '0'): 'a', ('c', '1'): 'd',
+            ('d', '0'): 'b', ('d', '1'): 'c',
+            ('e', '0'): 'e', ('e', '1'): 'e', ('e', 'x'): 'e',
+        }
+        fsm = FiniteStateMachine(
+            states={'a', 'b', 'c', 'd', 'e'},
+            alphabet={'0', '1', 'x'},
+            initial_state='a',
+            final_states={'c', 'd'},
+            transition_function=transitions
+        )
+        minimal = fsm.minimized()
+        
+        self.assertEqual(len(minimal.minimized()._states), 2)
+        self.assertEqual(len(minimal._states), 2)
+        self.assertEqual(minimal.current_state, 'a')
+        
+        # Same acceptance and same failures for every input of up to 6 symbols
+        for length in range(7):
+            for symbols in product('01x', repeat=length):
+                fsm.reset()
+                minimal.reset()
+                try:
+                    fsm.process_input(symbols)
+                except InvalidTransitionError:
+                    with self.assertRaises(InvalidTransitionError):
+                        minimal.process_input(symbols)
+                    continue
+                minimal.process_input(symbols)
+                self.assertEqual(minimal.is_in_final_state, fsm.is_in_final_state)
+        
+        # A rejecting trap state is not merged with undefined transitions
+        trap = FiniteStateMachine(
+            states={'a', 'trap'},
+            alphabet={'0', '1'},
+            initial_state='a',
+            final_states={'a'},
+            transition_function={('a', '0'): 'a', ('a', '1'): 'trap', ('trap', '0'): 'trap', ('trap', '1'): 'trap'}
+        ).minimized()
+        self.assertEqual(trap.process_input('10'), 'trap')
+        self.assertFalse(trap.is_in_final_state)
+        
+        # A callable FSM is tabulated for the minimization, but stays uncompiled
+        fsm = FiniteStateMachine(
+            states={'a', 'b', 'c'},
+            alphabet={'0', '1'},
+            initial_state='a',
+            final_states={'b', 'c'},
+            transition_function=lambda state, symbol: 'a' if symbol == '0' else ('b' if state == 'a' else 'c')
+        )
+        self.assertEqual(len(fsm.minimized()._states), 2)
+        self.assertFalse(fsm.is_compiled)
 
 
 if __name__ == '__main__':
@@ -10,7 +10,18 @@ Date: 2025-05-04
 import unittest
 import time
 import random
-from src.mod_three import ModThreeFSM, mod_three
+from itertools import product
+from unittest import mock
+from src import mod_three as mod_three_module
+from src.finite_state_machine import FSMException
+from src.mod_three import ModThreeFSM, ModThreeState, mod_three, mod_three_many, _CHUNK_TRANSITIONS, _TRANSITION_LUT
+from tests import recording_run_table
+
+
+def random_binary(length):
+    """Generate a random binary string of exactly length digits (leading zeros included)."""
+    # One C-level call for the whole string instead of one random.choice() per digit
+    return format(random.getrandbits(length), f'0{length}b')
 
 
 class TestModThreeFSM(unittest.TestCase):
@@ -119,6 +130,136 @@ class TestModThreeFSM(unittest.TestCase):
             
         with self.assertRaises(ValueError):
             self.fsm.compute_remainder('abc')
+        
+        # Inputs that are not strings
+        for binary in (b'101', ['1', '0']):
+            with self.assertRaises(ValueError):
+                self.fsm.compute_remainder(binary)
+    
+    def test_transition_lut(self):
+        """Test that the flat lookup table matches the FSM transition table."""
+        for (state, digit), next_state in ModThreeFSM.TRANSITIONS.items():
+            self.assertEqual(
+                _TRANSITION_LUT[(state.value << 1) | int(digit)],
+                next_state.value
+            )
+        
+        # Stepping runs on the compiled integer table, not on the dictionary
+        self.assertTrue(self.fsm._fsm.is_compiled)
+        
+        # compute_remainder does not move the stepping machine
+        self.fsm.process_single_input('1')
+        self.assertEqual(self.fsm.compute_remainder('1110'), 2)
+        self.assertEqual(self.fsm.current_state, ModThreeState.S1)
+        self.assertEqual(self.fsm.state_history, (ModThreeState.S0, ModThreeState.S1))
+    
+    def test_native_kernel_interface(self):
+        """Test the wiring of the optional mod-three kernel with a pure-Python stand-in."""
+        calls = []
+        
+        def compute_remainder(digits):
+            # Same contract as compute_remainder in src/_mod_three_core.pyx
+            calls.append(digits)
+            state = 0
+            for digit in digits:
+                if digit not in b'01':
+                    return -1
+                state = _TRANSITION_LUT[(state << 1) | (digit & 1)]
+            return state
+        
+        with mock.patch.object(mod_three_module, '_native_compute_remainder', compute_remainder):
+            self.assertEqual(self.fsm.compute_remainder('1101'), 1)
+            
+            # The kernel's -1 and non-ASCII input both become the usual ValueError
+            with self.assertRaises(ValueError):
+                self.fsm.compute_remainder('1201')
+            with self.assertRaises(ValueError):
+                self.fsm.compute_remainder('1\u00e901')
+            with self.assertRaises(ValueError):
+                self.fsm.compute_remainder('')
+        
+        # The kernel receives the ASCII digits themselves
+        self.assertEqual(calls, [b'1101', b'1201'])
+    
+    def test_history_tracking_disabled(self):
+        """Test stepping through the FSM with state history turned off."""
+        fsm = ModThreeFSM(track_history=False)
+        for digit in '1101':
+            fsm.process_single_input(digit)
+        self.assertEqual(fsm.current_state, ModThreeState.S1)
+        self.assertEqual(fsm.compute_remainder('1110'), 2)
+        
+        with self.assertRaises(FSMException):
+            fsm.state_history
+        
+        # compute_remainder leaves the history of a tracking FSM untouched
+        self.fsm.compute_remainder('1' * 100)
+        self.assertEqual(self.fsm.state_history, (ModThreeState.S0,))
+    
+    def test_independent_instances(self):
+        """Test that instances sharing one compiled FSM do not affect each other."""
+        other = ModThreeFSM()
+        self.assertIs(other._fsm._table, self.fsm._fsm._table)
+        
+        for digit in '110':
+            other.process_single_input(digit)
+        self.assertEqual(other.current_state, ModThreeState.S0)
+        self.assertEqual(len(other.state_history), 4)
+        self.assertEqual(self.fsm.current_state, ModThreeState.S0)
+        self.assertEqual(self.fsm.state_history, (ModThreeState.S0,))
+        self.assertEqual(ModThreeFSM().state_history, (ModThreeState.S0,))
+    
+    def test_chunk_transitions(self):
+        """Test the 8-digit composed table and inputs around the block boundaries."""
+        for state in ModThreeState:
+            for block, next_state in _CHUNK_TRANSITIONS[state.value].items():
+                self.assertEqual(next_state, (state.value * 256 + int(block, 2)) % 3)
+        
+        # Lengths with every possible number of leading single digits
+        for length in range(1, 26):
+            binary = random_binary(length)
+            self.assertEqual(self.fsm.compute_remainder(binary), int(binary, 2) % 3)
+        
+        # An invalid digit inside a block is still rejected
+        with self.assertRaises(ValueError):
+            self.fsm.compute_remainder('1' + '0101a101')
+    
+    def test_native_core_interface(self):
+        """Test the wiring of the optional compiled core with a pure-Python stand-in."""
+        calls = []
+        run_table = recording_run_table(calls)
+        
+        # The mod-three kernel takes precedence over the generic core, so it is disabled here
+        with mock.patch.object(mod_three_module, '_native_run_table', run_table), \
+                mock.patch.object(mod_three_module, '_native_compute_remainder', None):
+            self.assertEqual(self.fsm.compute_remainder('1101'), 1)
+            self.assertEqual(self.fsm.compute_remainder('1110'), 2)
+            
+            # Invalid input is rejected before reaching the core
+            with self.assertRaises(ValueError):
+                self.fsm.compute_remainder('1201')
+        
+        # The core receives the digits as column numbers
+        self.assertEqual(calls, [b'\x01\x01\x00\x01', b'\x01\x01\x01\x00'])
+    
+    def test_compute_remainders(self):
+        """Test the batch method against compute_remainder."""
+        binaries = [bin(n)[2:] for n in range(100)] + ['1' * 1000, '10' * 500]
+        self.assertEqual(
+            self.fsm.compute_remainders(binaries),
+            [self.fsm.compute_remainder(binary) for binary in binaries]
+        )
+        self.assertEqual(self.fsm.compute_remainders(iter(['1101', '1110'])), [1, 2])
+        self.assertEqual(self.fsm.compute_remainders([]), [])
+        
+        # One bad input fails the whole batch
+        with self.assertRaises(ValueError):
+            self.fsm.compute_remainders(['101', ''])
+        with self.assertRaises(ValueError):
+            self.fsm.compute_remainders(['101', '1201'])
+        for binary in (b'101', ['1', '0']):
+            with self.assertRaises(ValueError):
+                self.fsm.compute_remainders(['101', binary])
     
     def test_property_based(self):
         """
@@ -137,7 +278,7 @@ class TestModThreeFSM(unittest.TestCase):
         for _ in range(num_tests):
             # Generate a random binary string
             length = random.randint(1, max_length)
-            binary = ''.join(random.choice('01') for _ in range(length))
+            binary = random_binary(length)
             
             # Calculate expected result using traditional modulo
             decimal = int(binary, 2)
@@ -188,7 +329,7 @@ class TestModThreeFSM(unittest.TestCase):
         
         for length in lengths:
             # Generate a random binary string of the specified length
-            binary = ''.join(random.choice('01') for _ in range(length))
+            binary = random_binary(length)
             
             # Time the FSM computation
             start_time = time.time()
@@ -352,6 +493,16 @@ class TestModThreeFunction(unittest.TestCase):
             
         with self.assertRaises(ValueError):
             mod_three('abc')
+        
+        # Spellings that int(x, 2) would accept are still rejected
+        for binary in ('0b101', '1_0', ' 101', '+1'):
+            with self.assertRaises(ValueError):
+                mod_three(binary)
+        
+        # Inputs that are not strings
+        for binary in (b'101', ['1', '0']):
+            with self.assertRaises(ValueError):
+                mod_three(binary)
     
     def test_all_remainders(self):
         """Test that we get all possible remainders (0, 1, 2)."""
@@ -359,6 +510,40 @@ class TestModThreeFunction(unittest.TestCase):
         self.assertEqual(mod_three('1'), 1)    # 1 mod 3 = 1
         self.assertEqual(mod_three('10'), 2)   # 2 mod 3 = 2
         
+    def test_no_fsm_construction(self):
+        """Test that mod_three does not build a ModThreeFSM on each call."""
+        with mock.patch.object(mod_three_module, 'ModThreeFSM', side_effect=AssertionError):
+            self.assertEqual(mod_three('1101'), 1)
+    
+    def test_matches_fsm(self):
+        """Test that the closed form used by mod_three matches the FSM for every short input."""
+        fsm = ModThreeFSM()
+        for length in range(1, 11):
+            for bits in product('01', repeat=length):
+                binary = ''.join(bits)
+                self.assertEqual(mod_three(binary), fsm.compute_remainder(binary), binary)
+    
+    def test_mod_three_many(self):
+        """Test the batch function against mod_three."""
+        binaries = ['1101', '1110', '1111'] + [
+            random_binary(random.randint(1, 40))
+            for _ in range(50)
+        ]
+        self.assertEqual(mod_three_many(binaries), [mod_three(binary) for binary in binaries])
+        
+        # Any iterable works, and an empty batch gives no remainders
+        self.assertEqual(mod_three_many(iter(['10', '11'])), [2, 0])
+        self.assertEqual(mod_three_many([]), [])
+        
+        # One bad input fails the whole batch
+        with self.assertRaises(ValueError):
+            mod_three_many(['101', ''])
+        with self.assertRaises(ValueError):
+            mod_three_many(['101', '1201'])
+        for binary in (b'101', ['1', '0']):
+            with self.assertRaises(ValueError):
+                mod_three_many(['101', binary])
+    
     def test_property_based_function(self):
         """
         Property-based test for the mod_three function.
@@ -375,7 +560,7 @@ class TestModThreeFunction(unittest.TestCase):
         for _ in range(num_tests):
             # Generate a random binary string
             length = random.randint(1, max_length)
-            binary = ''.join(random.choice('01') for _ in range(length))
+            binary = random_binary(length)
             
             # Calculate expected result using traditional modulo
             decimal = int(binary, 2)